@@ -4,10 +4,19 @@
 # ------------------------
 
 # Imports
-import pygame, Config
-from Event import EventManager, EventListener
-from World import World
-from Player import Player
+import random
+import pygame, Config, Text, Audio, Trace
+from Event import EventManager, EventListener, PygameEvent
+from Spatial import SpatialGroup
+from Profiler import Profiler
+import Spores
+from Targeting import Targets
+from Pool import Pool
+from Hud import Hud
+from World import World, WorldPreparation
+from Player import Player, EnergyParticle
+from Friendly import FriendlySpore, FriendlyPlant, FriendlyTree
+from Enemy import EnemySpore, EnemyTree, EnemyFlying
 
 # -------- App --------
 class App( ):
@@ -15,6 +24,19 @@ class App( ):
 	mode = 'Menu' # temp, default to  menu
 	prefs = None
 	sprite_groups = {}
+	collision_tests = 0 # Collision pair tests made last frame
+	ticks = 0 # Game time passed in milliseconds
+	accumulator = 0.0 # Time waiting to be simulated, in milliseconds
+	prev_offset = 0 # Camera offset at the start of the last step
+	seed = None
+	spores = None # Spore engine, when spores are moved together
+	drawn_offset = None # Camera offset of the last full redraw
+	pools = { } # Killed sprites kept for reuse, by class
+	preparation = None # Next world, prepared while the menu is showing
+	starting = False # Clicked to start before the next world was ready
+	traced = False # Startup has been traced, only the first game loaded is part of it
+
+	control_PROFILER = pygame.K_F3
 
 	menu_text = "NEON SPORES - Click to start game"
 
@@ -32,7 +54,15 @@ class App( ):
 		# Create the event manager
 		self.em = EventManager( )
 
-		self.em.RegisterListener( AppListener() )
+		self.listener = self.em.RegisterListener( AppListener() )
+
+		# Create the mixer, silent when audio is off
+		self.audio = Audio.Create( )
+
+		# Create the profiler
+		self.profiler = Profiler( Config.profile )
+		if Config.profile:
+			self.profiler.Enable( )
 
 		# Load the preferences
 		prefs_file = open( "preferences.txt", "r" )
@@ -49,37 +79,127 @@ class App( ):
 		Config.screen_move_x = int( Config.screen_w * 0.4 )
 
 
+	# Prepare Game
+	# Start preparing the next world in the background, and decode the sprite
+	# sheets here on the main thread while it does
+	#
+	# @param object self
+	# @return None
+
+	def PrepareGame( self ):
+		seed = Config.seed
+		if seed == None:
+			seed = random.randint( 0, 1 << 30 )
+
+		self.preparation = WorldPreparation( Config.screen_w * Config.world_size, seed )
+
+		for c in (FriendlyPlant, FriendlyTree, EnemyTree, EnemyFlying):
+			c.Prebake( )
+
+
+	# Start Game
+	# Load the game if the next world is ready, otherwise once it is
+	#
+	# @param object self
+	# @return None
+
+	def StartGame( self ):
+		if self.preparation == None or self.preparation.done:
+			self.LoadGame( )
+		else:
+			self.starting = True
+
+
 	# Load Game
 	# Bring in all the required assets for the game and initialise starting
-	# objects
+	# objects, using the prepared world when there is one
 	#
 	# @return None
 
 	def LoadGame( self ):
+		world = None
+		if self.preparation != None:
+			world = self.preparation.Take( )
+		self.preparation = None
+		self.starting = False
+
+		# Only the first game loaded is part of starting up, so restarts and
+		# replays do not add to the trace
+		trace = not self.traced
+		self.traced = True
+
 		# Create the sprite groups and layers
 		self.sprite_groups['player'] = pygame.sprite.Group( )
 		self.sprite_groups['player-lives'] = pygame.sprite.Group( )
 		self.sprite_groups['energy-particles'] = pygame.sprite.Group( )
 
-		self.sprite_groups['friendly-plants'] = pygame.sprite.Group( )
-		self.sprite_groups['friendly-spores'] = pygame.sprite.Group( )
-		self.sprite_groups['friendly-trees'] = pygame.sprite.Group( )
+		self.sprite_groups['friendly-plants'] = SpatialGroup( )
+		self.sprite_groups['friendly-spores'] = SpatialGroup( )
+		self.sprite_groups['friendly-trees'] = SpatialGroup( )
 
-		self.sprite_groups['enemy-flying'] = pygame.sprite.Group( )
-		self.sprite_groups['enemy-spores'] = pygame.sprite.Group( )
-		self.sprite_groups['enemy-trees'] = pygame.sprite.Group( )
+		self.sprite_groups['enemy-flying'] = SpatialGroup( )
+		self.sprite_groups['enemy-spores'] = SpatialGroup( )
+		self.sprite_groups['enemy-trees'] = SpatialGroup( )
 
 		self.sprites_all = pygame.sprite.LayeredUpdates( )
-
-		# Create the world
-		Config.world = World( )
-		Config.world.GenerateTerrain( Config.screen_w * Config.world_size )
+		self.targets = Targets( )
+		self.hud = Hud( )
+
+		# Sprites made and killed often are reused
+		self.pools = { }
+		for cls in [EnergyParticle, FriendlySpore, EnemySpore, EnemyFlying]:
+			self.pools[ cls ] = Pool( cls, Config.pool_sizes[ cls.__name__ ] )
+
+		# Move spores together when NumPy is there to do it
+		self.spores = None
+		if Config.spore_engine:
+			if Spores.numpy != None:
+				self.spores = Spores.SporeEngine( )
+			else:
+				print "NumPy is not installed, spores will be moved one at a time"
+
+		# Decode and split every evolution stage before the game starts, already
+		# done if the world was prepared
+		if trace:
+			Trace.Begin( "assets" )
+		for c in (FriendlyPlant, FriendlyTree, EnemyTree, EnemyFlying):
+			c.Prebake( )
+		Trace.End( "assets" )
+
+		# Seed everything from one number, so a game can be run again exactly
+		if world != None:
+			self.seed = world.seed
+		else:
+			self.seed = Config.seed
+			if self.seed == None:
+				self.seed = random.randint( 0, 1 << 30 )
+		random.seed( self.seed )
+		self.ticks = 0
+
+		# Create the world, with the camera back at the start so the first
+		# frame is not drawn part way from where the last game left it
+		self.accumulator = 0.0
+		self.prev_offset = 0
+		Config.world_offset = 0
+		if trace:
+			Trace.Begin( "terrain" )
+		if world != None:
+			Config.world = world
+			world.Populate( )
+		else:
+			Config.world = World( )
+			Config.world.GenerateTerrain( Config.screen_w * Config.world_size, self.seed )
+		Trace.End( "terrain" )
 
 		self.mode = "Game"
+		self.drawn_offset = None
 
 		# Create the player
 		p = Player( )
 
+		if trace:
+			Trace.Begin( "first frame" )
+
 
 	# Unload Game
 	def UnloadGame( self ):
@@ -106,46 +226,325 @@ class App( ):
 			self.TickMenu( frame_time )
 
 
+	# Tick Game
+	# Simulate in fixed steps for the time that has passed, then draw
+	#
+	# @param object self
+	# @param float frame_time
+	# @return None
+
 	def TickGame( self, frame_time ):
+		self.profiler.BeginFrame( )
+
+		# Catch up a limited number of steps, so a long frame cannot make every
+		# following frame longer still
+		step = 1000.0 / Config.sim_rate
+		self.accumulator += frame_time
+		steps = 0
+		while self.accumulator >= step and steps < Config.max_substeps and self.mode == "Game":
+			self.UpdateGame( step )
+			self.accumulator -= step
+			steps += 1
+
+		if self.accumulator >= step:
+			self.accumulator %= step
+
+		# Sounds asked for by every step this frame
+		self.profiler.Begin( 'audio' )
+		self.audio.Flush( )
+		self.profiler.End( 'audio' )
+
+		if Config.render and self.mode == "Game":
+			self.DrawFrame( self.accumulator / step )
+
+		self.profiler.EndFrame( )
+
+
+	# Draw Frame
+	# Draw the game part way between the last two steps
+	#
+	# @param object self
+	# @param float alpha
+	# @return None
+
+	def DrawFrame( self, alpha ):
+		restore = None
+		if Config.interpolate:
+			restore = self.Interpolate( alpha )
+
+		# Only redraw what changed while the camera holds still
+		if Config.dirty_rects and self.drawn_offset == Config.world_offset:
+			self.DrawGameDirty( )
+		else:
+			self.DrawGame( )
+
+		if restore != None:
+			self.Restore( restore )
+
+
+	# Interpolate
+	# Move the camera and every sprite's rect to where they were part way
+	# through the last step
+	#
+	# @param object self
+	# @param float alpha
+	# @return list what to put back once drawn
+
+	def Interpolate( self, alpha ):
+		self.profiler.Begin( 'interpolate' )
+
+		offset = Config.world_offset
+		restore = [ offset ]
+		Config.world_offset = self.prev_offset + ((offset - self.prev_offset) * alpha)
+
+		for s in self.sprites_all:
+			prev = s.prev_vector
+			if prev == None:
+				continue
+
+			vector = s.vector
+			s.vector = [ prev[0] + ((vector[0] - prev[0]) * alpha), prev[1] + ((vector[1] - prev[1]) * alpha) ]
+			restore.append( (s, vector, s.rect.topleft) )
+			s.rect.topleft = (s.GetDrawPos(0), s.GetDrawPos(1))
+
+		self.profiler.End( 'interpolate' )
+		return restore
+
+
+	# Restore
+	# Undo Interpolate
+	#
+	# @param object self
+	# @param list restore
+	# @return None
+
+	def Restore( self, restore ):
+		Config.world_offset = restore[0]
+		for s, vector, pos in restore[1:]:
+			s.vector = vector
+			s.rect.topleft = pos
+
+
+	# Update Game
+	# Move the simulation on by one step
+	#
+	# @param object self
+	# @param float frame_time
+	# @return None
+
+	def UpdateGame( self, frame_time ):
+		profiler = self.profiler
+
+		# Remember where everything was, to draw between steps
+		if Config.render and Config.interpolate:
+			self.prev_offset = Config.world_offset
+			for s in self.sprites_all:
+				s.prev_vector = list( s.vector )
+
+		# Generate the terrain around the camera before it comes into view
+		profiler.Begin( 'stream' )
+		Config.world.Stream( -Config.world_offset, Config.screen_w - Config.world_offset )
+
+		# Look up the ground below spores and plants in one batch
+		for g in ('friendly-spores', 'enemy-spores', 'friendly-plants'):
+			if self.spores == None or g == 'friendly-plants':
+				Config.world.ResolveGround( self.sprite_groups[g] )
+		profiler.End( 'stream' )
+
+		if self.spores != None:
+			profiler.Begin( 'spores' )
+			self.spores.Step( frame_time )
+			profiler.End( 'spores' )
+
+		# Give flyers without a plant the nearest free one
+		self.targets.Assign( self.sprite_groups['enemy-flying'] )
+
+		# Update sprites
+		self.ticks += frame_time
+		SpatialGroup.pair_tests = 0
+		if profiler.enabled:
+			profiler.UpdateSprites( self.sprites_all, frame_time, self.ticks )
+		else:
+			for s in self.sprites_all:
+				s.Update( frame_time, self.ticks )
+		self.collision_tests = SpatialGroup.pair_tests
+
+		# Hand out this step's collision events
+		profiler.Begin( 'events' )
+		self.em.Flush( )
+		profiler.End( 'events' )
+
+		# Sprites killed this step can now be reused
+		for pool in self.pools.values( ):
+			pool.Recycle( )
+
+
+	# Draw Game
+	# Redraw the whole screen
+	#
+	# @param object self
+	# @return None
+
+	def DrawGame( self ):
+		profiler = self.profiler
 
 		# Fill with black
+		profiler.Begin( 'terrain' )
 		Config.screen.fill( (0,0,0) )
 
 		# Get terrain
-		Config.screen.blit( Config.world.terrain, (Config.world_offset, 0) )
+		Config.world.DrawTerrain( Config.screen )
+		profiler.End( 'terrain' )
 
 		# Nav Map
-		Config.screen.blit( Config.world.terrain_minimap, (Config.screen_w - Config.world.terrain_minimap.get_width( ), 0) )
-		navmap = Config.world.NavMap( )
+		self.DrawNavMap( )
 
-		# Add map to screen
-		Config.screen.blit( navmap, (Config.screen_w - Config.world.terrain_minimap.get_width( ), 0))
+		# Draw sprites
+		profiler.Begin( 'draw' )
+		self.sprites_all.draw( Config.screen )
+		profiler.End( 'draw' )
+
+		self.DrawHud( )
+		self.DrawOverlay( )
+
+		profiler.Begin( 'flip' )
+		pygame.display.flip( )
+		profiler.End( 'flip' )
+
+		self.drawn_offset = Config.world_offset
 
-		# Update sprites
-		for s in self.sprites_all:
-			s.Update( int(frame_time), int(pygame.time.get_ticks()) )
+
+	# Draw Game Dirty
+	# Redraw only the areas sprites have left or moved into, plus the nav map
+	#
+	# @param object self
+	# @return None
+
+	def DrawGameDirty( self ):
+		profiler = self.profiler
+
+		# Put the terrain back where sprites were last frame
+		profiler.Begin( 'terrain' )
+		self.sprites_all.clear( Config.screen, self.DrawBackground )
+		profiler.End( 'terrain' )
+
+		# Sprites may have been cleared off the nav map, so it is always redrawn
+		rects = [ self.DrawNavMap( ) ]
 
 		# Draw sprites
-		rects = self.sprites_all.draw( Config.screen )
+		profiler.Begin( 'draw' )
+		rects.extend( self.sprites_all.draw( Config.screen ) )
+		profiler.End( 'draw' )
 
-		#pygame.display.update( rects )
+		hud = self.DrawHud( )
+		if hud != None:
+			rects.append( hud )
 
-		pygame.display.flip( )
+		overlay = self.DrawOverlay( )
+		if overlay != None:
+			rects.append( overlay )
+
+		profiler.Begin( 'flip' )
+		pygame.display.update( rects )
+		profiler.End( 'flip' )
+
+
+	# Draw Background
+	# Restore the background behind an area of the screen
+	#
+	# @param object self
+	# @param Surface surface
+	# @param Rect rect
+	# @return None
+
+	def DrawBackground( self, surface, rect ):
+		surface.fill( (0,0,0), rect )
+		Config.world.DrawTerrain( surface, rect )
+
+
+	# Draw Nav Map
+	# @param object self
+	# @return Rect
+
+	def DrawNavMap( self ):
+		self.profiler.Begin( 'navmap' )
+		navmap_pos = (Config.screen_w - Config.world.terrain_minimap.get_width( ), 0)
+		Config.screen.blit( Config.world.terrain_minimap, navmap_pos )
+		Config.screen.blit( Config.world.NavMap( self.ticks ), navmap_pos )
+		Config.world.DrawNavMapViewport( Config.screen, navmap_pos )
+		self.profiler.End( 'navmap' )
+
+		return pygame.Rect( navmap_pos, Config.world.terrain_minimap.get_size( ) )
+
+
+	# Draw Hud
+	# @param object self
+	# @return Rect or None
+
+	def DrawHud( self ):
+		if not Config.hud:
+			return None
+
+		self.profiler.Begin( 'hud' )
+		rect = self.hud.Draw( Config.screen )
+		self.profiler.End( 'hud' )
+		return rect
+
+
+	# Draw Overlay
+	# Draw the profiler overlay when it is shown
+	#
+	# @param object self
+	# @return Rect or None
+
+	def DrawOverlay( self ):
+		self.profiler.Begin( 'overlay' )
+		rect = self.profiler.DrawOverlay( Config.screen )
+		self.profiler.End( 'overlay' )
+		return rect
 
 
 	def TickMenu( self, frame_time ):
-		pygame.font.init( )
-		font = pygame.font.SysFont( "Arial", 14 )
+		if self.preparation == None:
+			self.PrepareGame( )
+		elif self.starting and self.preparation.done:
+			self.LoadGame( )
+			return
 
-		text = font.render( self.menu_text, False, (255,255,255) )
+		text = Text.cache.Render( self.menu_text, 14, (255,255,255) )
 
 		Config.screen.blit( text, ((Config.screen_w / 2) - (text.get_width() / 2), (Config.screen_h / 2) - (text.get_height() / 2)) )
 
+		if self.starting:
+			self.DrawProgress( (Config.screen_h / 2) + text.get_height( ) )
+
 		pygame.display.flip( )
 
 
+	# Draw Progress
+	# Show how much of the next world is prepared, below the menu text
+	#
+	# @param object self
+	# @param int y
+	# @return None
+
+	def DrawProgress( self, y ):
+		label = Text.cache.Render( "Preparing world ", 14, Config.colour_player )
+		atlas = Text.cache.Atlas( 14, Config.colour_player, Text.digits + "%" )
+		percent = "%d%%" % int( self.preparation.progress * 100 )
+
+		width = label.get_width( ) + atlas.Size( "100%" )[0]
+		x = (Config.screen_w / 2) - (width / 2)
+
+		Config.screen.fill( (0,0,0), (x, y, width, max( label.get_height( ), atlas.height )) )
+		Config.screen.blit( label, (x, y) )
+		atlas.Draw( Config.screen, percent, (x + label.get_width( ), y) )
+
+
 # -------- App Listener --------
 class AppListener( EventListener ):
+	events = [PygameEvent]
+	pygame_types = [pygame.QUIT, pygame.KEYDOWN]
 
 	# Init
 	def __init__( self ):
@@ -153,7 +552,10 @@ class AppListener( EventListener ):
 
 	# Notify
 	def Notify( self, event ):
-		if event.name == "Pygame Event":
-			if event.data.type == pygame.QUIT:
-				Config.app.running = False
-				print "Exiting app..."
\ No newline at end of file
+		if event.data.type == pygame.QUIT:
+			Config.app.running = False
+			print "Exiting app..."
+		elif event.data.type == pygame.KEYDOWN:
+			if event.data.key == Config.app.control_PROFILER:
+				Config.app.profiler.ToggleOverlay( )
+				Config.app.drawn_offset = None
\ No newline at end of file
@@ -0,0 +1,150 @@
+# -------- Asset.py --------
+# Shared cache of decoded images and sliced animation frames, so every sprite
+# using the same sheet shares a single surface and frame list
+# ---------------------------
+
+# Imports
+import pygame
+import Config
+
+# Definitions
+folder = "sprites/"
+sound_folder = "sounds/"
+
+
+# -------- Asset Cache --------
+class AssetCache( ):
+
+	# Init
+	# Create the empty cache and its counters
+	#
+	# @param object self
+	# @return object self
+
+	def __init__( self ):
+		self.images = { }
+		self.frames = { }
+		self.sounds = { }
+		self.hits = 0
+		self.misses = 0
+
+
+	# Display Format
+	# Key describing the current display pixel format, surfaces converted for
+	# one format are not reused under another
+	#
+	# @param object self
+	# @return tuple
+
+	def DisplayFormat( self ):
+		display = pygame.display.get_surface( )
+		if display == None:
+			return None
+		return display.get_bitsize( ), display.get_masks( )
+
+
+	# Image
+	# Get the decoded, converted surface for a sprite source
+	#
+	# @param object self
+	# @param string src
+	# @return Surface
+
+	def Image( self, src ):
+		format = self.DisplayFormat( )
+		if (src, format) in self.images:
+			self.hits += 1
+		else:
+			self.misses += 1
+		return self.Decode( src, format )
+
+
+	# Decode
+	# Load and convert a sprite source the first time it is needed. Not
+	# counted, Image and Frames count their own hits and misses
+	#
+	# @param object self
+	# @param string src
+	# @param tuple format
+	# @return Surface
+
+	def Decode( self, src, format ):
+		key = (src, format)
+		image = self.images.get( key )
+		if image == None:
+			image = self.images[ key ] = pygame.image.load( folder+src ).convert_alpha( )
+		return image
+
+
+	# Frames
+	# Get the list of frames a sheet is split into. The list is shared by all
+	# sprites using the sheet and must not be modified
+	#
+	# @param object self
+	# @param string src
+	# @param int count
+	# @return list
+
+	def Frames( self, src, count ):
+		format = self.DisplayFormat( )
+		key = (src, count, format)
+		frames = self.frames.get( key )
+		if frames == None:
+			self.misses += 1
+			image = self.Decode( src, format )
+			width, height = image.get_size( )
+			frame_width = width / count
+
+			frames = [ ]
+			for i in range( count ):
+				frames.append( image.subsurface(i * frame_width, 0, frame_width, height) )
+
+			self.frames[ key ] = frames
+		else:
+			self.hits += 1
+		return frames
+
+
+	# Sound
+	# Get a loaded sound. The mixer must already be started, see Audio
+	#
+	# @param object self
+	# @param string src
+	# @return Sound
+
+	def Sound( self, src ):
+		sound = self.sounds.get( src )
+		if sound == None:
+			self.misses += 1
+			sound = self.sounds[ src ] = pygame.mixer.Sound( sound_folder+src )
+		else:
+			self.hits += 1
+		return sound
+
+
+	# Invalidate
+	# Drop everything, should be called whenever the display mode changes
+	#
+	# @param object self
+	# @return None
+
+	def Invalidate( self ):
+		self.images = { }
+		self.frames = { }
+
+
+	# Stats
+	# @param object self
+	# @return dict
+
+	def Stats( self ):
+		return {
+			'hits': self.hits,
+			'misses': self.misses,
+			'images': len( self.images ),
+			'frames': len( self.frames )
+		}
+
+
+# Process wide cache
+cache = AssetCache( )
\ No newline at end of file
@@ -0,0 +1,179 @@
+# -------- Audio.py --------
+# Plays every sound in the game through a fixed set of mixer channels. Sounds
+# asked for during a frame are gathered up and played together once it ends,
+# so a burst of the same sound only plays it as many times as it is allowed
+# ---------------------------
+
+# Imports
+import pygame
+import Config, Asset
+
+
+# Init
+# Start the mixer with the settings from Config. A small buffer keeps sounds
+# in time with the game, too small and they crackle
+#
+# @return None
+
+def Init( ):
+	pygame.mixer.init( Config.audio_frequency, -16, 2, Config.audio_buffer )
+
+
+# Create
+# The mixer to use, a silent one when audio is turned off
+#
+# @return object
+
+def Create( ):
+	if Config.audio:
+		return Mixer( )
+	return NullMixer( )
+
+
+
+# -------- Mixer --------
+class Mixer( ):
+
+	# Init
+	# @param object self
+	# @return object self
+
+	def __init__( self ):
+		self.channels = None # Opened when the first sound is played
+		self.playing = { } # Sound last played on each channel
+		self.requests = { } # Left and right volume of each sound asked for this frame
+
+		self.played = 0
+		self.merged = 0
+		self.dropped = 0
+
+
+	# Open
+	# Take the channels sounds are played on
+	#
+	# @param object self
+	# @return None
+
+	def Open( self ):
+		if not pygame.mixer.get_init( ):
+			Init( )
+		pygame.mixer.set_num_channels( Config.audio_channels )
+		self.channels = [ pygame.mixer.Channel( i ) for i in range( Config.audio_channels ) ]
+
+
+	# Play
+	# Ask for a sound to be played at the end of the frame. A sound asked for
+	# more than once in a frame is played once, as loud as the loudest ask
+	#
+	# @param object self
+	# @param string src
+	# @param (optional) float x World position the sound comes from
+	# @param (optional) float volume
+	# @return None
+
+	def Play( self, src, x=None, volume=1.0 ):
+		left, right = self.Attenuate( x, volume )
+		if left <= 0 and right <= 0:
+			self.dropped += 1
+			return
+
+		request = self.requests.get( src )
+		if request == None:
+			self.requests[ src ] = [left, right]
+		else:
+			self.merged += 1
+			request[0] = max( request[0], left )
+			request[1] = max( request[1], right )
+
+
+	# Attenuate
+	# Left and right volume of a sound, quieter the further it is from the
+	# middle of the screen and panned to the side it is on
+	#
+	# @param object self
+	# @param float x
+	# @param float volume
+	# @return tuple
+
+	def Attenuate( self, x, volume ):
+		if x == None:
+			return volume, volume
+
+		half_w = Config.screen_w / 2.0
+		dx = x + Config.world_offset - half_w
+		volume *= 1.0 - (abs( dx ) / Config.audio_range)
+		if volume <= 0:
+			return 0.0, 0.0
+
+		pan = max( -1.0, min( dx / half_w, 1.0 ) )
+		return volume * min( 1.0, 1.0 - pan ), volume * min( 1.0, 1.0 + pan )
+
+
+	# Flush
+	# Play the sounds asked for this frame on free channels. A sound already
+	# playing on as many channels as Config.audio_voices is not played again,
+	# and when every channel is busy the rest are dropped
+	#
+	# @param object self
+	# @return None
+
+	def Flush( self ):
+		if not self.requests:
+			return
+		if self.channels == None:
+			self.Open( )
+
+		voices = { }
+		free = [ ]
+		for i, channel in enumerate( self.channels ):
+			if channel.get_busy( ):
+				src = self.playing.get( i )
+				voices[ src ] = voices.get( src, 0 ) + 1
+			else:
+				free.append( i )
+
+		for src, (left, right) in self.requests.items( ):
+			if not free or voices.get( src, 0 ) >= Config.audio_voices:
+				self.dropped += 1
+				continue
+
+			i = free.pop( )
+			channel = self.channels[ i ]
+			channel.play( Asset.cache.Sound( src ) )
+			channel.set_volume( left, right )
+
+			self.playing[ i ] = src
+			voices[ src ] = voices.get( src, 0 ) + 1
+			self.played += 1
+
+		self.requests.clear( )
+
+
+	# Stats
+	# @param object self
+	# @return dict
+
+	def Stats( self ):
+		return {
+			'played': self.played,
+			'merged': self.merged,
+			'dropped': self.dropped
+		}
+
+
+
+# -------- Null Mixer --------
+# Silent stand in for the mixer, used when audio is turned off
+class NullMixer( ):
+
+	# Play
+	def Play( self, src, x=None, volume=1.0 ):
+		pass
+
+	# Flush
+	def Flush( self ):
+		pass
+
+	# Stats
+	def Stats( self ):
+		return { 'played': 0, 'merged': 0, 'dropped': 0 }
\ No newline at end of file
@@ -0,0 +1,142 @@
+# -------- Benchmark.py --------
+# Scripted scenarios that drive the game loop headlessly and measure how long
+# each tick takes, split between updating, collisions and drawing
+# ---------------------------
+
+# Imports
+import time, math
+import Config, Headless
+from Profiler import Profiler, phases
+
+# Definitions
+# Each scenario is a world size, the headless presets to add and how many
+# ticks to run. Tests can load any of these with Setup
+scenarios = {
+	'spores': {
+		'description': "500 friendly spores landing",
+		'world_size': 4,
+		'presets': ['spores'],
+		'ticks': 600
+	},
+	'spores-3000': {
+		'description': "3000 friendly spores landing",
+		'world_size': 4,
+		'presets': ['spores'] * 6,
+		'ticks': 600
+	},
+	'flyers': {
+		'description': "50 level 4 enemy flyers hunting plants",
+		'world_size': 4,
+		'presets': ['flyers'],
+		'ticks': 600
+	},
+	'firing': {
+		'description': "Player firing continuously across the whole world",
+		'world_size': 4,
+		'presets': ['firing'],
+		'ticks': 1200
+	},
+	'world-32': {
+		'description': "Player flying across a world 32 screens wide",
+		'world_size': 32,
+		'presets': ['firing'],
+		'ticks': 1200
+	}
+}
+
+
+# Setup
+# Configure and load the game for a scenario, ready to be ticked
+#
+# @param string name
+# @param (optional) int seed
+# @return object app
+
+def Setup( name, seed=0 ):
+	scenario = scenarios[ name ]
+
+	Config.world_size = scenario['world_size']
+	Config.world_offset = 0
+	Config.seed = seed
+
+	return Headless.Load( scenario['presets'] )
+
+
+# Percentile
+# Nearest rank percentile of a sorted list
+#
+# @param list values
+# @param int p
+# @return float
+
+def Percentile( values, p ):
+	if not values:
+		return 0.0
+	i = int( math.ceil( (p / 100.0) * len( values ) ) ) - 1
+	return values[ max( 0, min( i, len( values ) - 1 ) ) ]
+
+
+# Run
+# Run a scenario and measure it. Time per phase and per sprite class comes
+# from a profiler swapped in for the run
+#
+# @param string name
+# @param (optional) float frame_time
+# @param (optional) int ticks
+# @param (optional) int seed
+# @return dict
+
+def Run( name, frame_time=None, ticks=None, seed=0 ):
+	scenario = scenarios[ name ]
+	if frame_time == None:
+		frame_time = 1000.0 / Config.sim_rate
+	if ticks == None:
+		ticks = scenario['ticks']
+
+	app = Setup( name, seed )
+	sprites = len( app.sprites_all )
+
+	profiler = app.profiler
+	app.profiler = timer = Profiler( True )
+	timer.Enable( )
+	try:
+		frames = [ ]
+		start = time.time( )
+		while len( frames ) < ticks and app.running and app.mode == "Game":
+			frame_start = time.time( )
+			app.Tick( frame_time )
+			frames.append( (time.time( ) - frame_start) * 1000.0 )
+		seconds = time.time( ) - start
+	finally:
+		timer.Disable( )
+		app.profiler = profiler
+
+	ran = len( frames )
+	frames.sort( )
+
+	averages = timer.Averages( timer.samples )
+	split = dict( (p, averages.get( p, 0.0 )) for p in phases )
+	classes = dict( (key[6:], ms) for key, ms in averages.items( ) if key.startswith( 'class:' ) )
+
+	return {
+		'description': scenario['description'],
+		'world_size': scenario['world_size'],
+		'presets': scenario['presets'],
+		'seed': seed,
+		'frame_time': frame_time,
+		'ticks': ran,
+		'seconds': seconds,
+		'ticks_per_second': ran / max( seconds, 0.001 ),
+		'sprites_start': sprites,
+		'sprites_end': len( app.sprites_all ),
+		'frame_ms': {
+			'mean': sum( frames ) / max( ran, 1 ),
+			'p50': Percentile( frames, 50 ),
+			'p95': Percentile( frames, 95 ),
+			'p99': Percentile( frames, 99 ),
+			'max': frames[-1] if frames else 0.0
+		},
+		'split_ms': split,
+		'classes_ms': classes,
+		'pools': dict( (cls.__name__, pool.Stats( )) for cls, pool in app.pools.items( ) )
+	}
\ No newline at end of file
@@ -4,7 +4,24 @@
 
 # General Information
 app_title = "Neon Spores"
-fps = 60
+fps = 60 # Most frames drawn per second
+sim_rate = 60 # Simulation steps per second, whatever the frame rate
+max_substeps = 5 # Most steps simulated in one frame to catch up
+interpolate = True # Draw sprites between their last two steps
+dirty_rects = False # Only update changed areas of the screen while the camera is still
+audio = True # Load and play sounds
+audio_channels = 16 # Mixer channels sounds are played on
+audio_voices = 4 # Most channels playing the same sound at once
+audio_range = 1600 # Distance from the middle of the screen at which sounds go silent
+audio_frequency = 22050 # Mixer sample rate
+audio_buffer = 512 # Mixer buffer in samples
+render = True # Draw the game, turned off to only run the simulation
+hud = True # Show lives, plant energy and territory while playing
+text_cache = 64 # Most rendered strings kept for reuse
+profile = False # Time every frame from the start, the overlay can also be toggled in game
+profile_history = 120 # Frames averaged and graphed by the profiler overlay
+profile_file = "profile.csv" # Where profiled frames are written on exit, .json for JSON
+trace = False # Print how long each part of starting up takes
 
 # Sprite Layers
 sprite_layer_player = 1
@@ -15,6 +32,20 @@ sprite_layer_terrain = 4
 # World
 world_size = 4
 world_offset = 0
+spore_engine = False # Move all spores at once with NumPy, when it is installed
+seed = None # Terrain seed, a new one is picked for each world when None
+spatial_cell_size = 64 # Width of collision index cells in pixels
+navmap_rate = 10 # Nav map refreshes per second
+pool_sizes = { # Most killed sprites of each class kept for reuse
+	'EnergyParticle': 64,
+	'FriendlySpore': 1024,
+	'EnemySpore': 1024,
+	'EnemyFlying': 64
+}
+terrain_tile_width = 256 # Width of the tiles terrain is drawn into
+terrain_tile_cache = 12 # Most terrain tiles kept drawn at once
+terrain_chunk_width = 512 # Width of the chunks terrain is generated in
+terrain_stream_distance = 1024 # How far ahead of the camera terrain is generated
 
 # Colours
 colour_player = (115, 241, 255)
@@ -3,24 +3,22 @@
 # ---------------------------
 
 # Imports
-import random, pygame.mixer
+import random
 import Config, Vector2D
 from Sprite import StaticSprite, AnimatedSprite, MovingSprite
-from Event import EventListener, Event
-
-# Load sounds
-pygame.mixer.init( )
-sound_die = pygame.mixer.Sound( "sounds/enemy-die.wav" )
+from Event import EventListener, Event, CollisionEvent
 
 
 # -------- Enemy Spore --------
 class EnemySpore( AnimatedSprite ):
 	looking = False
 	growing = False
-	move_vector = [0,0]
 	speed = 40
+	walk = -1 # Walks away from the way it faces
 	gravity = 4
 	health = 60.0
+	slot = None # Place in the spore engine, when it moves this spore
+	stack = None # Spores growing on the same water hole, once growing
 
 	# Init
 	def __init__( self, vector ):
@@ -32,62 +30,82 @@ class EnemySpore( AnimatedSprite ):
 		self.AddAnimationState( "idle", 0, 2, 6 )
 		self.SetAnimationState( "idle" )
 
-		x = random.randint(0, 1) + random.random()
-		self.direction = random.randint(0, 1)
-		if self.direction == 0: self.direction = -1
-		y = 1 + random.random()
-		self.move_vector = [x * self.direction, -y]
-
 		self.collide_with = [
 			{
 				'group': Config.app.sprite_groups['friendly-spores'],
 				'module': 'Friendly',
-				'event': 'CollisionEvent'
+				'event': CollisionEvent
 			}
 		]
 
+		self.Reset( vector )
+
+
+	# Reset
+	# Start a new spore, used by init and by the pool when a spore is reused
+	def Reset( self, vector ):
+		self.vector = vector
+		self.looking = False
+		self.growing = False
+		self.stack = None
+		self.health = EnemySpore.health
+
+		x = random.randint(0, 1) + random.random()
+		self.direction = random.randint(0, 1)
+		if self.direction == 0: self.direction = -1
+		y = 1 + random.random()
+		self.move_vector = [x * self.direction, -y]
+
+		self.Rejoin( )
+
+		if Config.app.spores != None:
+			Config.app.spores.Add( self )
 
-	# OnCollision
-	def OnCollision( self, c ):
 
-		if self.growing:
-			for es in Config.app.sprite_groups['enemy-spores']:
-				if es.vector[0] == self.vector[0]:
-					es.kill( ) 
+	# Kill
+	def kill( self ):
+		if self.slot != None:
+			Config.app.spores.Remove( self )
+		if self.stack != None:
+			self.stack.remove( self )
+			self.stack = None
+		AnimatedSprite.kill( self )
 
-		if c.growing:
-			for fs in Config.app.sprite_groups['friendly-spores']:
-				if fs.vector[0] == c.vector[0]:
-					fs.kill( )
+
+	# OnCollision
+	def OnCollision( self, c ):
+		# Growing spores take their whole stack with them
+		if self.stack != None:
+			for es in list( self.stack ):
+				es.kill( )
+
+		if c.stack != None:
+			for fs in list( c.stack ):
+				fs.kill( )
 		
 		self.kill( )
 		c.kill( )
 
 
 	# Check On Water
+	# Dead spores are left out, a spore can be killed by one updated before it
+	# in the same step
 	def CheckOnWater( self ):
-		if self.looking == True and self.growing == False:
+		if self.looking == True and self.growing == False and self.alive( ):
 			xc, ym, terrain = Config.world.GroundType( self.vector[0] )
 			if terrain == 'water':
 				self.growing = True
 
-				# Move to center of water hole
+				# Stack on top of other spores in the center of the water hole
+				self.stack = Config.world.SporeStack( self.__class__, xc )
 				self.vector[0] = xc
-				self.vector[1] = ym
-
-				# Stack on top of other spores
-				height = 0
-				spores = [self]
-				base = self.vector
-				for spore in Config.app.sprite_groups['enemy-spores']:
-					if spore != self and spore.vector[0] == self.vector[0]:
-						height += 1
-						spores.append(spore)
-						self.vector[1] -= 8
+				self.vector[1] = ym - (8 * len( self.stack ))
+				self.stack.append( self )
 
 				# If tall enough, kill spores and convert to tree
-				if height > 9:
-					for spore in spores:
+				if len( self.stack ) > 10:
+					base = self.vector
+					for spore in list( self.stack ):
 						spore.kill( )
 
 					EnemyTree( base )
@@ -97,7 +115,17 @@ class EnemySpore( AnimatedSprite ):
 
 	# Update
 	def Update( self, frame_time, ticks ):
+		# Killed earlier this step
+		if not self.alive( ):
+			return
+
+		# Moved along with the other spores
+		if self.slot != None:
+			AnimatedSprite.Update( self, frame_time, ticks )
+			return
+
 		m = frame_time / 1000.0
+		t = self.TickScale( frame_time )
 
 		if self.vector[0] <= 0:
 			self.direction = -self.direction
@@ -107,7 +135,7 @@ class EnemySpore( AnimatedSprite ):
 			self.vector[0] = Config.screen_w * Config.world_size 
 
 		# Get ground height
-		ground_height, ground_angle = Config.world.GroundInfo( self.vector[0] )
+		ground_height, ground_angle = self.GetGround( )
 
 		if self.growing == True:
 			# Found water and growing
@@ -117,16 +145,16 @@ class EnemySpore( AnimatedSprite ):
 			# In the air
 			if self.vector[1] < ground_height - 6:
 				self.move_vector[1] += self.gravity * m
-				self.vector = Vector2D.AddVectors( self.vector, self.move_vector )
+				self.vector = Vector2D.AddVectors( self.vector, Vector2D.MultiplyVectors( self.move_vector, [t, t] ) )
 			else:
 				self.looking = True
 
 		elif self.looking == True:
 			# Moving on the ground
 			if self.vector[1] < ground_height - 6:
-				self.vector[1] += 1
+				self.vector[1] += t
 			elif self.vector[1] > ground_height - 6:
-				self.vector[1] -= 1
+				self.vector[1] -= t
 
 			self.vector[0] += (self.speed * m * -self.direction)
 
@@ -145,6 +173,11 @@ class EnemySpore( AnimatedSprite ):
 class EnemyTree( AnimatedSprite ):
 	energy_up_rate = 1
 	spawn_wait = 12000 # 6 seconds
+
+	stages = [
+		{ 'src': "enemies/tree-1.png", 'states': [("idle", 0, 5, 6)] },
+		{ 'src': "enemies/tree-2.png", 'states': [("idle", 0, 5, 6)], 'energy': 30 }
+	]
 	
 
 	# Init
@@ -152,14 +185,13 @@ class EnemyTree( AnimatedSprite ):
 		self.groups = Config.app.sprite_groups['enemy-trees'], Config.app.sprites_all
 		self._layer = Config.sprite_layer_enemies
 
-		AnimatedSprite.__init__( self, "enemies/tree-1.png", vector )
+		AnimatedSprite.__init__( self, self.stages[0]['src'], vector )
 
 		self.level = 1
 		self.energy = 1.0
 		self.last_spawn = self.spawn_wait
 
-		self.AddAnimationState( "idle", 0, 5, 6 )
-		self.SetAnimationState( "idle" )
+		self.SetStage( 1 )
 
 		#Config.app.em.RegisterListener( FriendlyTreePlayerCollisionListener() )
 
@@ -169,17 +201,14 @@ class EnemyTree( AnimatedSprite ):
 		m = frame_time / 1000.0
 
 		self.energy += (self.energy_up_rate * m)
-
-		if self.energy > 30:
-			self.level = 2
-			self.ReloadSrc( "enemies/tree-2.png" )
+		self.Evolve( )
 
 		if self.level == 2:
 			if self.last_spawn <= 0:
 				self.last_spawn = self.spawn_wait
 				r = 1 + int(self.energy / 200)
 				for i in range(r):
-					EnemyFlying( self.vector )
+					EnemyFlying.New( self.vector )
 			else:
 				self.last_spawn -= frame_time
 
@@ -195,6 +224,13 @@ class EnemyFlying( MovingSprite ):
 	dccl		= [5.0, 5.0]
 	spawn_wait = 10000 # Every 10 seconds
 
+	stages = [
+		{ 'src': "enemies/flying-1.png", 'states': [("flying", 0, 5, 12)] },
+		{ 'src': "enemies/flying-2.png", 'states': [("flying", 0, 5, 12)] },
+		{ 'src': "enemies/flying-3.png", 'states': [("flying", 0, 5, 12)] },
+		{ 'src': "enemies/flying-4.png", 'states': [("flying", 0, 5, 12)] }
+	]
+
 	# Init
 	def __init__( self, vector ):
 		# Set groups & layer
@@ -204,10 +240,18 @@ class EnemyFlying( MovingSprite ):
 		# Create as animated sprite
 		MovingSprite.__init__(
 			self,
-			"enemies/flying-1.png",
+			self.stages[0]['src'],
 			vector
 		)
 
+		self.Reset( vector )
+
+
+	# Reset
+	# Start a new flyer, used by init and by the pool when a flyer is reused
+	def Reset( self, vector ):
+		self.vector = vector
+
 		self.direction = 1
 		if random.randint(0,1): self.direction = -1
 
@@ -220,42 +264,26 @@ class EnemyFlying( MovingSprite ):
 		self.level = -1
 		self.health = 2
 
-		self.AddAnimationState( "flying", 0, 5, 12 )
-		self.SetAnimationState( "flying" )
-
-
-	# Find Nearest Friendly Plant
-	def FindNearestFriendlyPlant( self ):
-		for plant in Config.app.sprite_groups['friendly-plants']:
-			if plant.state == "eating" and plant.targeted == False:
-				return plant
-		return False
+		self.SetStage( 1 )
+		self.Rejoin( )
 
 
 	# Move To Nearest Friendly Plant
+	# Head for the plant this flyer has been given, plants are handed out to
+	# every flyer at once at the start of each tick
 	def MoveToNearestFriendlyPlant( self, frame_time ):
 		m = frame_time / 1000.0
-		
-		if self.target == False:
-			self.target = self.FindNearestFriendlyPlant( )
 
 		if self.target == False:
 			# Roam
 			self.is_accl[0] = self.direction
 
 		else:
-			if self.target.targeted and self.target.targeted_by != self:
-				self.target = False
+			x = self.vector[0] + (self.rect.w / 2)
+			if x > self.target.vector[0]:
+				self.is_accl[0] = -1
 			else:
-				x = self.vector[0] + (self.rect.w / 2)
-				if x > self.target.vector[0]:
-					self.is_accl[0] = -1
-				else:
-					self.is_accl[0] = 1
-
-				if x > self.target.vector[0] - 10 and x < self.target.vector[0] + 10:
-					self.target.targeted = True
-					self.target.targeted_by = self
+				self.is_accl[0] = 1
 
 		if self.last_spawn <= 0:
 			self.Spawn( )
@@ -270,7 +298,7 @@ class EnemyFlying( MovingSprite ):
 			r = self.level * 5
 
 		for i in range( r ):
-			EnemySpore( Vector2D.AddVectors(self.vector, [self.rect.w/2, 0]) )
+			EnemySpore.New( Vector2D.AddVectors(self.vector, [self.rect.w/2, 0]) )
 
 		# Level up
 		self.level += 1
@@ -279,24 +307,14 @@ class EnemyFlying( MovingSprite ):
 		else:
 			if self.level > 1:
 				self.health = self.level * 2
-				self.ReloadSrc( "enemies/flying-"+str(self.level)+".png" )
+				self.SetStage( self.level )
 
 	# Die Overly Dramtically
 	def DieOverlyDramatically( self ):
 		self.Spawn( 1 )
-		if self.target:
-			self.target.targeted = False
-			self.target.targeted_by = None
-
-		dist_to_player = abs(self.vector[0] - Config.player.vector[0])
-		if dist_to_player == 0: dist_to_player = 1
-		volume = 100.0 / float(Config.screen_w * Config.world_size)
-		volume = volume * (float(Config.screen_w * Config.world_size) - float(dist_to_player * 1.5))
-		if volume < 0: volume = 1.0
-		volume = volume / 200.0
-		sound_die.set_volume( volume )
-
-		sound_die.play( )
+		Config.app.targets.Release( self )
+
+		Config.app.audio.Play( "enemy-die.wav", self.vector[0], 0.5 )
 
 		self.kill( )
 
@@ -2,6 +2,9 @@
 # Handles event capturing, filtering and posting to listeners
 # --------------------------
 
+# Imports
+import weakref, inspect
+
 # -------- Event --------
 # Superclass for any events that might be generated by an object and sent to
 # the EventManager
@@ -13,10 +16,12 @@ class Event( ):
 	# 
 	# @param object self
 	# @param (optional) any data
+	# @param (optional) any source
 	# @return object self
 
-	def __init__( self, data=None ):
+	def __init__( self, data=None, source=None ):
 		self.data = data
+		self.source = source
 
 
 
@@ -44,8 +49,12 @@ class EnemyFlyingEnergyCollisionEvent ( CollisionEvent ):
 
 
 # -------- Event Listener --------
-# Superclass for any event listeners
+# Superclass for any event listeners. Listeners are only sent the classes of
+# event they list, and pygame events only of the types they list when they
+# list any
 class EventListener( ):
+	events = [] # Event classes, subclasses of these are sent too
+	pygame_types = [] # Pygame event types wanted, all of them when empty
 
 	# Init
 	# Create the event listener object
@@ -64,7 +73,8 @@ class EventListener( ):
 
 # -------- Event Manager --------
 # Responsible for coordinating events and communication between the models,
-# views and controllers
+# views and controllers. Listeners are held weakly, whatever registers one
+# keeps it alive for as long as it should hear events
 class EventManager( ):
 
 	# Init
@@ -74,22 +84,38 @@ class EventManager( ):
 	# @return object self
 
 	def __init__( self ):
-		self.listeners = [ ]
+		self.routes = { } # Event class, or event class and pygame type, to listeners
+		self.instances = weakref.WeakValueDictionary( ) # Listener class to its listener
+		self.classes = { } # Event class to the classes it is routed under
+		self.posted = { }
+		self.handled = { }
+		self.coalesced = { }
+
+		self.queue = [ ] # Events waiting for the next flush, in the order queued
+		self.queued = set( ) # Class, data and source of every queued event
 
 
 	# Register Listener
-	# Append a new listener to the event manager
+	# Add a listener, one listener of each class is registered at a time. The
+	# one already registered is returned in place of a new one, and should be
+	# kept instead
 	#
 	# @param object self
 	# @param object listener
-	# @return None
+	# @return object listener
 
 	def RegisterListener( self, listener ):
-		for l in self.listeners:
-			if l.__class__.__name__ == listener.__class__.__name__:
-				return False
+		existing = self.instances.get( listener.__class__ )
+		if existing != None:
+			return existing
+
+		self.instances[ listener.__class__ ] = listener
+
+		ref = weakref.ref( listener, self.Prune )
+		for key in self.Keys( listener ):
+			self.routes.setdefault( key, [ ] ).append( ref )
 
-		self.listeners.append( listener )
+		return listener
 
 	
 	# Un-register Listener
@@ -100,17 +126,108 @@ class EventManager( ):
 	# @return None
 
 	def UnRegisterListener( self, listener ):
-		pass
+		if self.instances.get( listener.__class__ ) is listener:
+			del self.instances[ listener.__class__ ]
+
+		for key in self.Keys( listener ):
+			refs = self.routes.get( key, [ ] )
+			refs[:] = [ r for r in refs if r( ) is not listener ]
+
+
+	# Keys
+	# Routes a listener is registered under
+	def Keys( self, listener ):
+		keys = [ ]
+		for cls in listener.events:
+			if cls is PygameEvent and listener.pygame_types:
+				keys.extend( (cls, t) for t in listener.pygame_types )
+			else:
+				keys.append( cls )
+		return keys
+
+
+	# Prune
+	# Drop a listener that has been garbage collected
+	def Prune( self, ref ):
+		for refs in self.routes.values( ):
+			if ref in refs:
+				refs.remove( ref )
 
 
 	# Post
-	# Post the event to all the registered listeners
+	# Send the event to the listeners registered for its class, or any class
+	# it comes from
 	#
 	# @param object self
 	# @param object event
 	# @return None
 
 	def Post( self, event ):
-		# Broadcast event to all listeners
-		for listener in self.listeners:
-			listener.Notify( event )
\ No newline at end of file
+		cls = event.__class__
+		name = cls.__name__
+		self.posted[ name ] = self.posted.get( name, 0 ) + 1
+
+		keys = self.classes.get( cls )
+		if keys == None:
+			keys = self.classes[ cls ] = inspect.getmro( cls )
+
+		if cls is PygameEvent:
+			keys = ( (cls, event.data.type), ) + keys
+
+		for key in keys:
+			refs = self.routes.get( key )
+			if not refs:
+				continue
+
+			for ref in list( refs ):
+				listener = ref( )
+				if listener != None:
+					listener.Notify( event )
+					self.handled[ name ] = self.handled.get( name, 0 ) + 1
+
+
+	# Queue
+	# Hold an event back until the next flush. An event of the same class, data
+	# and source already waiting is not queued again
+	#
+	# @param object self
+	# @param class cls
+	# @param (optional) any data
+	# @param (optional) any source
+	# @return None
+
+	def Queue( self, cls, data=None, source=None ):
+		key = (cls, data, source)
+		if key in self.queued:
+			name = cls.__name__
+			self.coalesced[ name ] = self.coalesced.get( name, 0 ) + 1
+			return
+
+		self.queued.add( key )
+		self.queue.append( cls( data, source ) )
+
+
+	# Flush
+	# Post every queued event in the order they were queued. Events queued
+	# while flushing wait for the next flush
+	#
+	# @param object self
+	# @return None
+
+	def Flush( self ):
+		queue = self.queue
+		self.queue = [ ]
+		self.queued = set( )
+
+		for event in queue:
+			self.Post( event )
+
+
+	# Stats
+	# Events posted, handled and merged into others by each class of event
+	#
+	# @param object self
+	# @return dict
+
+	def Stats( self ):
+		return { 'posted': dict( self.posted ), 'handled': dict( self.handled ), 'coalesced': dict( self.coalesced ) }
\ No newline at end of file
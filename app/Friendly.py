@@ -3,21 +3,20 @@
 # -----------------------------
 
 # Imports
-import random, pygame.mixer
+import random
 import Config, Vector2D
 from Sprite import StaticSprite, AnimatedSprite, MovingSprite
-from Event import EventListener, Event
+from Event import EventListener, Event, FriendlyPlantEnergyCollisionEvent, FriendlyTreePlayerCollisionEvent
 
-# Load sounds
-pygame.mixer.init( )
-sound_spawn = pygame.mixer.Sound( "sounds/friendly-spawn.wav" )
-sound_plant_pickup = pygame.mixer.Sound( "sounds/friendly-plant-pickup.wav" )
 
 # -------- Friendly Spore --------
 class FriendlySpore( AnimatedSprite ):
 	speed = 40
+	walk = 1 # Walks the way it faces
 	gravity = 1
 	health = 60.0
+	slot = None # Place in the spore engine, when it moves this spore
+	stack = None # Spores growing on the same water hole, once growing
 
 	# Init
 	def __init__( self, vector ):
@@ -26,9 +25,20 @@ class FriendlySpore( AnimatedSprite ):
 
 		AnimatedSprite.__init__( self, "friendlies/spore.png", vector )
 
+		self.AddAnimationState( "idle", 0, 2, 6 )
+		self.SetAnimationState( "idle" )
+
+		self.Reset( vector )
+
+
+	# Reset
+	# Start a new spore, used by init and by the pool when a spore is reused
+	def Reset( self, vector ):
+		self.vector = vector
 		self.looking = False
 		self.growing = False
-		self.move_vector = [0,0]
+		self.stack = None
+		self.health = FriendlySpore.health
 
 		x = random.random()
 		self.direction = random.randint(0, 1)
@@ -36,34 +46,41 @@ class FriendlySpore( AnimatedSprite ):
 		y = random.randint(1, 3) + random.random()
 		self.move_vector = [x * self.direction, -y]
 
-		self.AddAnimationState( "idle", 0, 2, 6 )
-		self.SetAnimationState( "idle" )
+		self.Rejoin( )
+
+		if Config.app.spores != None:
+			Config.app.spores.Add( self )
+
+
+	# Kill
+	def kill( self ):
+		if self.slot != None:
+			Config.app.spores.Remove( self )
+		if self.stack != None:
+			self.stack.remove( self )
+			self.stack = None
+		AnimatedSprite.kill( self )
 
 
 	# Check On Water
+	# Dead spores are left out, a spore can be killed by one updated before it
+	# in the same step
 	def CheckOnWater( self ):
-		if self.looking == True and self.growing == False:
+		if self.looking == True and self.growing == False and self.alive( ):
 			xc, ym, terrain = Config.world.GroundType( self.vector[0] )
 			if terrain == 'water':
 				self.growing = True
 
-				# Move to center of water hole
+				# Stack on top of other spores in the center of the water hole
+				self.stack = Config.world.SporeStack( self.__class__, xc )
 				self.vector[0] = xc
-				self.vector[1] = ym
-
-				# Stack on top of other spores
-				height = 0
-				spores = [self]
-				base = self.vector
-				for spore in Config.app.sprite_groups['friendly-spores']:
-					if spore != self and spore.vector[0] == self.vector[0]:
-						height += 1
-						spores.append(spore)
-						self.vector[1] -= 8
+				self.vector[1] = ym - (8 * len( self.stack ))
+				self.stack.append( self )
 
 				# If tall enough, kill spores and convert to tree
-				if height > 9:
-					for spore in spores:
+				if len( self.stack ) > 10:
+					base = self.vector
+					for spore in list( self.stack ):
 						spore.kill( )
 
 					FriendlyTree( base )
@@ -73,7 +90,17 @@ class FriendlySpore( AnimatedSprite ):
 
 	# Update
 	def Update( self, frame_time, ticks ):
+		# Killed earlier this step
+		if not self.alive( ):
+			return
+
+		# Moved along with the other spores
+		if self.slot != None:
+			AnimatedSprite.Update( self, frame_time, ticks )
+			return
+
 		m = frame_time / 1000.0
+		t = self.TickScale( frame_time )
 
 		if self.vector[0] <= 0:
 			self.direction = -self.direction
@@ -83,7 +110,7 @@ class FriendlySpore( AnimatedSprite ):
 			self.vector[0] = Config.screen_w * Config.world_size 
 
 		# Get ground height
-		ground_height, ground_angle = Config.world.GroundInfo( self.vector[0] )
+		ground_height, ground_angle = self.GetGround( )
 
 		if self.growing == True:
 			# Found water and growing
@@ -93,16 +120,16 @@ class FriendlySpore( AnimatedSprite ):
 			# In the air
 			if self.vector[1] < ground_height - 6:
 				self.move_vector[1] += self.gravity * m
-				self.vector = Vector2D.AddVectors( self.vector, self.move_vector )
+				self.vector = Vector2D.AddVectors( self.vector, Vector2D.MultiplyVectors( self.move_vector, [t, t] ) )
 			else:
 				self.looking = True
 
 		elif self.looking == True:
 			# Moving on the ground
 			if self.vector[1] < ground_height - 6:
-				self.vector[1] += 1
+				self.vector[1] += t
 			elif self.vector[1] > ground_height - 6:
-				self.vector[1] -= 1
+				self.vector[1] -= t
 
 			self.vector[0] += (self.speed * m * self.direction)
 
@@ -120,20 +147,24 @@ class FriendlySpore( AnimatedSprite ):
 class FriendlyTree( AnimatedSprite ):
 	energy_up_rate = 1
 
+	stages = [
+		{ 'src': "friendlies/tree-1.png", 'states': [("idle", 0, 11, 6)] },
+		{ 'src': "friendlies/tree-2.png", 'states': [("idle", 0, 11, 6)], 'energy': 30 }
+	]
+
 	# Init
 	def __init__( self, vector ):
 		self.groups = Config.app.sprite_groups['friendly-trees'], Config.app.sprites_all
 		self._layer = Config.sprite_layer_friendlies
 
-		AnimatedSprite.__init__( self, "friendlies/tree-1.png", vector )
+		AnimatedSprite.__init__( self, self.stages[0]['src'], vector )
 
 		self.energy = 1.0
 		self.level = 1
 
-		self.AddAnimationState( "idle", 0, 11, 6 )
-		self.SetAnimationState( "idle" )
+		self.SetStage( 1 )
 
-		Config.app.em.RegisterListener( FriendlyTreePlayerCollisionListener() )
+		self.listeners = [ Config.app.em.RegisterListener( FriendlyTreePlayerCollisionListener() ) ]
 
 
 	# CapturedByPlayer
@@ -148,7 +179,7 @@ class FriendlyTree( AnimatedSprite ):
 
 			Config.player.has_captured = True
 
-			sound_plant_pickup.play( )
+			Config.app.audio.Play( "friendly-plant-pickup.wav" )
 
 
 	# Update
@@ -156,10 +187,7 @@ class FriendlyTree( AnimatedSprite ):
 		m = frame_time / 1000.0
 
 		self.energy += (self.energy_up_rate * m)
-
-		if self.energy > 30:
-			self.level = 2
-			self.ReloadSrc( "friendlies/tree-2.png" )
+		self.Evolve( )
 
 		AnimatedSprite.Update( self, frame_time, ticks )
 
@@ -171,6 +199,11 @@ class FriendlyPlant( AnimatedSprite ):
 	spawn_wait = 10000 # every 10 seconds
 	energy_up_rate = 10
 
+	stages = [
+		{ 'src': "friendlies/plant-1.png", 'states': [("eating", 0, 3, 4)] },
+		{ 'src': "friendlies/plant-2.png", 'states': [("eating", 0, 3, 4)], 'energy': 100 }
+	]
+
 	# Init
 	def __init__( self ):
 		# Set groups & layer
@@ -180,7 +213,7 @@ class FriendlyPlant( AnimatedSprite ):
 		# Create as animated sprite
 		AnimatedSprite.__init__(
 			self,
-			"friendlies/plant-1.png",
+			self.stages[0]['src'],
 			[random.randint(100, random.randint(300, Config.screen_w - 300)), 0]
 		)
 
@@ -193,26 +226,37 @@ class FriendlyPlant( AnimatedSprite ):
 		self.targeted = False
 		self.targeted_by = None
 
-		self.AddAnimationState( "eating", 0, 3, 4 )
 		#self.AddAnimationState( "jumping", 4, 9, 4 )
 		#self.AddAnimationState( "falling", 10, 10, 1 )
 		#self.AddAnimationState( "landing", 11, 15, 4 )
-		self.SetAnimationState( "eating" )
+		self.SetStage( 1 )
+
+		self.listeners = [ Config.app.em.RegisterListener( FriendlyPlantEnergyCollisionListener() ) ]
+
+
+	# Kill
+	def kill( self ):
+		AnimatedSprite.kill( self )
+		Config.app.targets.Place( self )
+
+
+	# Set Animation State
+	# Flyers only hunt plants in some states
+	def SetAnimationState( self, name ):
+		AnimatedSprite.SetAnimationState( self, name )
+		Config.app.targets.Place( self )
+
+
+	# Ground X
+	def GroundX( self ):
+		return self.vector[0] + (self.rect.w/2)
 
-		Config.app.em.RegisterListener( FriendlyPlantEnergyCollisionListener() )
 
 	# Spawn
 	def Spawn( self ):
 		self.last_spawn = self.spawn_wait
 
-		dist_to_player = abs(self.vector[0] - Config.player.vector[0])
-		if dist_to_player == 0: dist_to_player = 1
-		volume = 100.0 / float(Config.screen_w * Config.world_size)
-		volume = volume * (float(Config.screen_w * Config.world_size) - float(dist_to_player * 1.5))
-		if volume < 0: volume = 1.0
-		volume = volume / 200.0
-		sound_spawn.set_volume( volume )
-		sound_spawn.play( )
+		Config.app.audio.Play( "friendly-spawn.wav", self.vector[0], 0.5 )
 
 		# Create a friendly spore
 		if self.level == 1:
@@ -221,26 +265,24 @@ class FriendlyPlant( AnimatedSprite ):
 			r = random.randint( 1 + int(self.energy / 20), 1 + int(self.energy / 10) )
 
 		for i in range( r ):
-			FriendlySpore( Vector2D.AddVectors(self.vector, [self.rect.w/2, 0]) )
+			FriendlySpore.New( Vector2D.AddVectors(self.vector, [self.rect.w/2, 0]) )
 
 
 	# Increase Energy
 	def IncreaseEnergy( self ):
 		self.energy += self.energy_up_rate
+		self.Evolve( )
 
 		if self.energy > 100:
 			self.energy = 100
 
-			if self.level == 1:
-				self.level = 2
-				self.ReloadSrc( "friendlies/plant-2.png" )
-
 	# Update
 	def Update( self, frame_time, ticks ):
 		m = frame_time / 1000.0
 
 		if self.captured:
 			self.vector = Vector2D.AddVectors( Config.player.vector, [5, 20] )
+			Config.app.targets.Place( self )
 
 		else:
 
@@ -248,7 +290,7 @@ class FriendlyPlant( AnimatedSprite ):
 			#self.energy += (self.energy_up_rate * m)
 
 			# Get ground height at centre x of bug
-			ground_height, ground_angle = Config.world.GroundInfo( self.vector[0] + (self.rect.w/2) )
+			ground_height, ground_angle = self.GetGround( )
 
 			# Get bottom of bug
 			#self.image_angle = ground_angle
@@ -259,7 +301,7 @@ class FriendlyPlant( AnimatedSprite ):
 				self.vector = Vector2D.AddVectors( self.vector, [0, self.gravity * m] )
 
 			elif bottom > ground_height:
-				self.vector = Vector2D.SubtractVectors( self.vector, [0, 1] )
+				self.vector = Vector2D.SubtractVectors( self.vector, [0, self.TickScale( frame_time )] )
 			else:
 				self.SetAnimationState( "eating" )
 
@@ -276,15 +318,17 @@ class FriendlyPlant( AnimatedSprite ):
 
 # -------- Friendly Plant Energy Collision Listener --------
 class FriendlyPlantEnergyCollisionListener( EventListener ):
+	events = [FriendlyPlantEnergyCollisionEvent]
+
 	# Notify
 	def Notify( self, event ):
-		if event.name == "Friendly Plant Energy Collision Event":
-			event.data.IncreaseEnergy( )
+		event.data.IncreaseEnergy( )
 
 
 # -------- Friendly Tree Player Collision Listener --------
 class FriendlyTreePlayerCollisionListener( EventListener ):
+	events = [FriendlyTreePlayerCollisionEvent]
+
 	# Notify
 	def Notify( self, event ):
-		if event.name == "Friendly Tree Player Collision Event":
-			event.data.CapturedByPlayer( )
\ No newline at end of file
+		event.data.CapturedByPlayer( )
\ No newline at end of file
@@ -0,0 +1,77 @@
+# -------- Headless.py --------
+# Runs the game with no window and no audio, at a fixed time step and as fast
+# as the CPU allows
+# ---------------------------
+
+# Imports
+import random, time
+import Config
+from Friendly import FriendlySpore, FriendlyPlant
+from Enemy import EnemyFlying
+
+
+# -------- Presets --------
+# Entities added to the starting world, each is called once the game has
+# loaded
+
+def PresetSpores( ):
+	for i in range( 500 ):
+		FriendlySpore.New( [random.randint(0, Config.screen_w * Config.world_size), random.randint(0, Config.screen_h / 4)] )
+
+def PresetFlyers( ):
+	for i in range( 20 ):
+		FriendlyPlant( )
+
+	# Keep clear of the player's starting screen
+	for i in range( 50 ):
+		flyer = EnemyFlying.New( [random.randint(Config.screen_w, Config.screen_w * Config.world_size), 50] )
+		flyer.level = 3
+		flyer.Spawn( 0 )
+
+def PresetFiring( ):
+	Config.player.is_firing_energy = True
+	Config.player.is_accl[0] = 1
+	Config.player.direction = 1
+
+presets = {
+	'spores': PresetSpores,
+	'flyers': PresetFlyers,
+	'firing': PresetFiring
+}
+
+
+# Load
+# Load a game and add the entities of each preset to it
+#
+# @param (optional) list preset_names
+# @return object app
+
+def Load( preset_names=[] ):
+	app = Config.app
+	app.LoadGame( )
+
+	for name in preset_names:
+		presets[ name ]( )
+
+	return app
+
+
+# Run
+# Load a game and run it for a number of ticks of fixed length, stopping
+# early if the game ends
+#
+# @param int ticks
+# @param float frame_time
+# @param (optional) list preset_names
+# @return int ticks run, float seconds taken
+
+def Run( ticks, frame_time, preset_names=[] ):
+	app = Load( preset_names )
+
+	start = time.time( )
+	run = 0
+	while run < ticks and app.running and app.mode == "Game":
+		app.Tick( frame_time )
+		run += 1
+
+	return run, time.time( ) - start
\ No newline at end of file
@@ -0,0 +1,96 @@
+# -------- Hud.py --------
+# Lives, plant energy and territory shown in game. Labels are rendered once
+# and numbers are drawn from glyph atlases, and the panel is only put
+# together again when one of the numbers changes
+# ---------------------------
+
+# Imports
+import pygame
+import Config, Text
+
+# Definitions
+size = 12
+pos = (8, 48)
+widest = "000000" # Room kept for each number
+padding = 4
+
+
+# -------- Hud --------
+class Hud( ):
+
+	# Init
+	# @param object self
+	# @return object self
+
+	def __init__( self ):
+		self.values = None
+		self.panel = None
+
+		# Label and number colour of each row
+		self.rows = [
+			("LIVES", Config.colour_player),
+			("PLANT ENERGY", Config.colour_friendly),
+			("TERRITORY", Config.colour_friendly)
+		]
+
+
+	# Values
+	# The numbers to show, in row order, then enemy territory
+	#
+	# @param object self
+	# @return tuple
+
+	def Values( self ):
+		lives = max( Config.player.lives, 0 ) if Config.player != None else 0
+		energy = sum( int( p.energy ) for p in Config.app.sprite_groups['friendly-plants'] )
+		counts = Config.world.ground_counts
+		return lives, energy, counts.get( 'friendly', 0 ), counts.get( 'enemy', 0 )
+
+
+	# Build
+	# Put the panel together for a set of values
+	#
+	# @param object self
+	# @param tuple values
+	# @return Surface
+
+	def Build( self, values ):
+		labels = [ Text.cache.Render( label, size, colour ) for label, colour in self.rows ]
+		atlases = [ Text.cache.Atlas( size, colour ) for label, colour in self.rows ]
+		enemy = Text.cache.Atlas( size, Config.colour_enemy )
+
+		label_w = max( l.get_width( ) for l in labels )
+		number_w = enemy.Size( widest )[0]
+		line_h = max( Text.cache.Font( size ).get_linesize( ), enemy.height )
+
+		if self.panel == None:
+			w = label_w + (number_w * 2) + (padding * 4)
+			self.panel = pygame.Surface( (w, (line_h * len( labels )) + (padding * 2)) )
+		panel = self.panel
+		panel.fill( (0,0,0) )
+
+		x = label_w + (padding * 2)
+		y = padding
+		for label, atlas, value in zip( labels, atlases, values ):
+			panel.blit( label, (padding, y) )
+			atlas.Draw( panel, str( value ), (x, y) )
+			y += line_h
+
+		# Enemy territory beside the friendly count
+		enemy.Draw( panel, str( values[3] ), (x + number_w + padding, y - line_h) )
+
+		return panel
+
+
+	# Draw
+	# @param object self
+	# @param Surface surface
+	# @return Rect
+
+	def Draw( self, surface ):
+		values = self.Values( )
+		if values != self.values:
+			self.Build( values )
+			self.values = values
+
+		return surface.blit( self.panel, pos )
\ No newline at end of file
@@ -5,14 +5,10 @@
 # Imports
 import pygame, Config
 import Vector2D
-from Event import EventManager, EventListener
+from Event import EventManager, EventListener, PygameEvent, CollisionEvent
+from Event import FriendlyTreePlayerCollisionEvent, FriendlyPlantEnergyCollisionEvent, EnemyFlyingEnergyCollisionEvent
 from Sprite import StaticSprite, MovingSprite
 
-# Load sounds
-pygame.mixer.init( )
-sound_shoot = pygame.mixer.Sound( "sounds/player-shoot.wav" )
-sound_player_die = pygame.mixer.Sound( "sounds/player-die.wav" )
-sound_shoot.set_volume( 0.5 )
 
 # -------- Player --------
 class Player( MovingSprite ):
@@ -24,12 +20,8 @@ class Player( MovingSprite ):
 	control_MOVE_LEFT = pygame.K_a
 
 	max_speed 	= [600.0, 400.0] # Pixels per second
-	cur_speed 	= [0.0, 0.0]
 	accl 		= [10.0, 20.0] # Change per second
 	dccl		= [5.0, 10.0]
-	is_accl 	= [0, 0]
-
-	move_vector = [0, 0]
 
 	energy_flip = 0
 	energy_rate = 8 # per second
@@ -60,19 +52,21 @@ class Player( MovingSprite ):
 		self.SetAnimationState( "moving-right" )
 
 		# Register listeners
-		Config.app.em.RegisterListener( PlayerMouseListener() )
-		Config.app.em.RegisterListener( PlayerKeyboardListener() )
+		self.listeners = [
+			Config.app.em.RegisterListener( PlayerMouseListener() ),
+			Config.app.em.RegisterListener( PlayerKeyboardListener() )
+		]
 
 		self.collide_with = [
 			{
 				'group': Config.app.sprite_groups['friendly-trees'],
 				'module': 'Friendly',
-				'event': 'FriendlyTreePlayerCollisionEvent'
+				'event': FriendlyTreePlayerCollisionEvent
 			},
 			{
 				'group': Config.app.sprite_groups['enemy-flying'],
 				'module': 'Enemy',
-				'event': 'CollisionEvent'
+				'event': CollisionEvent
 			}
 		]
 
@@ -94,7 +88,7 @@ class Player( MovingSprite ):
 				vector = Vector2D.AddVectors( self.vector, [self.direction * 20, 19] )
 
 			# Create energy particle
-			EnergyParticle( vector, self.direction )
+			EnergyParticle.New( vector, self.direction )
 
 
 	# Fire Pulse
@@ -113,7 +107,7 @@ class Player( MovingSprite ):
 	def OnCollision( self, c ):
 		if c.__class__.__name__ == "EnemyFlying":
 			self.lives -= 1
-			sound_player_die.play( )
+			Config.app.audio.Play( "player-die.wav" )
 
 			for l in Config.app.sprite_groups['player-lives']:
 				if l.life == self.lives + 1:
@@ -241,23 +235,32 @@ class EnergyParticle( StaticSprite ):
 
 		StaticSprite.__init__( self, "player/energy-particle.png", vector )
 
-		self.direction = direction
-
-		sound_shoot.play( )
-
 		self.collide_with = [
 			{
 				'group': Config.app.sprite_groups['friendly-plants'],
 				'module': 'Friendly',
-				'event': 'FriendlyPlantEnergyCollisionEvent'
+				'event': FriendlyPlantEnergyCollisionEvent
 			},
 			{
 				'group': Config.app.sprite_groups['enemy-flying'],
 				'module': 'Enemy',
-				'event': 'EnemyFlyingEnergyCollisionEvent'
+				'event': EnemyFlyingEnergyCollisionEvent
 			}
 		]
 
+		self.Reset( vector, direction )
+
+
+	# Reset
+	# Fire a new particle, used by init and by the pool when a particle is reused
+	def Reset( self, vector, direction ):
+		self.vector = vector
+		self.direction = direction
+
+		self.Rejoin( )
+
+		Config.app.audio.Play( "player-shoot.wav", self.vector[0], 0.5 )
+
 
 	# Update
 	def Update( self, frame_time, ticks ):
@@ -284,26 +287,30 @@ class EnergyParticle( StaticSprite ):
 
 # -------- Player Keyboard Listener --------
 class PlayerKeyboardListener( EventListener ):
+	events = [PygameEvent]
+	pygame_types = [pygame.KEYDOWN, pygame.KEYUP]
+
 	# Notify
 	def Notify( self, event ):
-		if event.name == "Pygame Event":
-			if event.data.type == pygame.KEYDOWN:
-				Config.player.ControlKeyDown( event.data )
+		if event.data.type == pygame.KEYDOWN:
+			Config.player.ControlKeyDown( event.data )
 
-			elif event.data.type == pygame.KEYUP:
-				Config.player.ControlKeyUp( event.data )
+		elif event.data.type == pygame.KEYUP:
+			Config.player.ControlKeyUp( event.data )
 
 
 # -------- Player Mouse Listener ---------
 class PlayerMouseListener( EventListener ):
+	events = [PygameEvent]
+	pygame_types = [pygame.MOUSEBUTTONDOWN, pygame.MOUSEBUTTONUP, pygame.MOUSEMOTION]
+
 	# Notify
 	def Notify( self, event ):
-		if event.name == "Pygame Event":
-			if event.data.type == pygame.MOUSEBUTTONDOWN:
-				Config.player.ControlMouseDown( event.data )
+		if event.data.type == pygame.MOUSEBUTTONDOWN:
+			Config.player.ControlMouseDown( event.data )
 
-			elif event.data.type == pygame.MOUSEBUTTONUP:
-				Config.player.ControlMouseUp( event.data )
+		elif event.data.type == pygame.MOUSEBUTTONUP:
+			Config.player.ControlMouseUp( event.data )
 
-			elif event.data.type == pygame.MOUSEMOTION:
-				Config.player.ControlMouseMotion( event.data )
\ No newline at end of file
+		elif event.data.type == pygame.MOUSEMOTION:
+			Config.player.ControlMouseMotion( event.data )
\ No newline at end of file
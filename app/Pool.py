@@ -0,0 +1,91 @@
+# -------- Pool.py --------
+# Pools of killed sprites kept to be reused, so sprites that are made and
+# killed many times a second are not built from scratch each time
+# ---------------------------
+
+
+# -------- Pool --------
+# Sprites join a pool when they are killed and are reset when acquired again.
+# Killed sprites only become free at the end of the step they die in, since
+# the rest of the step may still be looking at them
+class Pool( ):
+
+	# Init
+	# @param object self
+	# @param class cls
+	# @param int size Most free sprites kept
+	# @return object self
+
+	def __init__( self, cls, size ):
+		self.cls = cls
+		self.size = size
+
+		self.free = [ ]
+		self.released = [ ]
+
+		self.live = 0
+		self.high = 0 # Most sprites live at once
+		self.created = 0
+		self.reused = 0
+
+
+	# Acquire
+	# Get a sprite, reusing a free one when there is one
+	#
+	# @param object self
+	# @param any args Passed to the sprite's init or reset
+	# @return object
+
+	def Acquire( self, *args ):
+		if self.free:
+			sprite = self.free.pop( )
+			sprite.Reset( *args )
+			self.reused += 1
+		else:
+			sprite = self.cls( *args )
+			self.created += 1
+
+		self.live += 1
+		if self.live > self.high:
+			self.high = self.live
+
+		return sprite
+
+
+	# Release
+	# Take back a killed sprite
+	#
+	# @param object self
+	# @param object sprite
+	# @return None
+
+	def Release( self, sprite ):
+		self.live -= 1
+		self.released.append( sprite )
+
+
+	# Recycle
+	# Free the sprites killed this step
+	#
+	# @param object self
+	# @return None
+
+	def Recycle( self ):
+		if self.released:
+			room = self.size - len( self.free )
+			self.free.extend( self.released[:max( room, 0 )] )
+			self.released = [ ]
+
+
+	# Stats
+	# @param object self
+	# @return dict
+
+	def Stats( self ):
+		return {
+			'live': self.live,
+			'high': self.high,
+			'free': len( self.free ),
+			'created': self.created,
+			'reused': self.reused
+		}
\ No newline at end of file
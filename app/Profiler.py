@@ -0,0 +1,301 @@
+# -------- Profiler.py --------
+# Times each part of a game frame, and the sprite updates of each class, then
+# shows rolling averages on screen and writes every frame out on exit
+# ---------------------------
+
+# Imports
+import time, json, csv
+from collections import deque
+import pygame
+import Config, Text
+from Sprite import Sprite
+
+# Definitions
+overlay_size = 12
+overlay_chars = Text.digits + ".ms" # Every character the overlay's times are made of
+
+# Parts of a frame in the order they happen
+phases = ['stream', 'spores', 'update', 'collision', 'events', 'audio', 'interpolate', 'terrain', 'navmap', 'draw', 'hud', 'overlay', 'flip']
+
+# Collision checks are timed by wrapping the method that runs them, only while
+# a profiler is on. It is wrapped once however many profilers are on, and the
+# time goes to the one enabled last
+check_collisions = Sprite.__dict__['CheckCollisions']
+timing = [ ] # Enabled profilers, oldest first
+
+
+# Timed Check Collisions
+# Sprite.CheckCollisions while a profiler is on
+#
+# @param object sprite
+# @return None
+
+def TimedCheckCollisions( sprite ):
+	frame = timing[-1].frame
+	start = time.time( )
+	try:
+		return check_collisions( sprite )
+	finally:
+		frame['collision'] = frame.get( 'collision', 0 ) + time.time( ) - start
+
+
+# -------- Profiler --------
+# Begin and End do nothing until the profiler is enabled, so an idle profiler
+# only costs a method call per phase per frame
+class Profiler( ):
+
+	# Init
+	# @param object self
+	# @param (optional) bool record Keep every frame to be dumped, otherwise
+	# only the rolling history the overlay shows is kept
+	# @return object self
+
+	def __init__( self, record=False ):
+		self.enabled = False
+		self.overlay = False
+		self.record = record
+		self.frames = 0 # Frames profiled
+
+		self.started = { }
+		self.frame = { } # Seconds per phase this frame
+		self.classes = { } # Seconds updating sprites of each class this frame
+		self.frame_start = 0
+
+		self.samples = [ ] # One dict of milliseconds for every profiled frame, when recording
+		self.history = deque( maxlen=Config.profile_history )
+
+
+	# Enable
+	# Start profiling, timing collision checks as well
+	#
+	# @param object self
+	# @return None
+
+	def Enable( self ):
+		if self.enabled:
+			return
+		self.enabled = True
+
+		timing.append( self )
+		Sprite.CheckCollisions = TimedCheckCollisions
+
+
+	# Disable
+	# Stop profiling, in any order with other profilers
+	#
+	# @param object self
+	# @return None
+
+	def Disable( self ):
+		if not self.enabled:
+			return
+		self.enabled = False
+
+		timing.remove( self )
+		if not timing:
+			Sprite.CheckCollisions = check_collisions
+		self.started.clear( )
+		self.frame.clear( )
+		self.classes.clear( )
+
+
+	# Toggle Overlay
+	# Show or hide the overlay, profiling while it is shown unless profiling
+	# was turned on from the start
+	#
+	# @param object self
+	# @return None
+
+	def ToggleOverlay( self ):
+		self.overlay = not self.overlay
+		if self.overlay:
+			self.Enable( )
+		elif not Config.profile:
+			self.Disable( )
+
+
+	# Begin Frame
+	def BeginFrame( self ):
+		if self.enabled:
+			self.frame_start = time.time( )
+
+
+	# Begin
+	# @param object self
+	# @param string phase
+	# @return None
+
+	def Begin( self, phase ):
+		if self.enabled:
+			self.started[ phase ] = time.time( )
+
+
+	# End
+	# @param object self
+	# @param string phase
+	# @return None
+
+	def End( self, phase ):
+		if self.enabled and phase in self.started:
+			self.frame[ phase ] = self.frame.get( phase, 0 ) + time.time( ) - self.started.pop( phase )
+
+
+	# Update Sprites
+	# Update every sprite, timing each class. Used in place of the plain update
+	# loop while profiling
+	#
+	# @param object self
+	# @param Group sprites
+	# @param int frame_time
+	# @param int ticks
+	# @return None
+
+	def UpdateSprites( self, sprites, frame_time, ticks ):
+		classes = self.classes
+		now = time.time
+
+		self.Begin( 'update' )
+		for s in sprites:
+			start = now( )
+			s.Update( frame_time, ticks )
+			name = s.__class__.__name__
+			classes[ name ] = classes.get( name, 0 ) + now( ) - start
+		self.End( 'update' )
+
+
+	# End Frame
+	# Record the frame just timed as a sample
+	#
+	# @param object self
+	# @return None
+
+	def EndFrame( self ):
+		if not self.enabled:
+			return
+
+		frame = self.frame
+
+		# Collisions are checked during sprite updates, keep them apart
+		if 'update' in frame:
+			frame['update'] -= frame.get( 'collision', 0 )
+
+		sample = { 'frame': self.frames, 'total': (time.time( ) - self.frame_start) * 1000.0 }
+		self.frames += 1
+		for phase, seconds in frame.items( ):
+			sample[ phase ] = seconds * 1000.0
+		for name, seconds in self.classes.items( ):
+			sample[ 'class:' + name ] = seconds * 1000.0
+
+		if self.record:
+			self.samples.append( sample )
+		self.history.append( sample )
+
+		frame.clear( )
+		self.classes.clear( )
+
+
+	# Averages
+	# Mean milliseconds of every recorded column over the rolling history
+	#
+	# @param object self
+	# @param (optional) list samples
+	# @return dict
+
+	def Averages( self, samples=None ):
+		if samples == None:
+			samples = self.history
+
+		totals = { }
+		for sample in samples:
+			for key, ms in sample.items( ):
+				if key != 'frame':
+					totals[ key ] = totals.get( key, 0 ) + ms
+
+		count = max( len( samples ), 1 )
+		return dict( (key, ms / count) for key, ms in totals.items( ) )
+
+
+	# Draw Overlay
+	# Draw the rolling averages and a graph of recent frame times in the bottom
+	# left of the screen
+	#
+	# @param object self
+	# @param Surface surface
+	# @return Rect or None
+
+	def DrawOverlay( self, surface ):
+		if not self.overlay:
+			return None
+
+		font = Text.cache.Font( overlay_size )
+		numbers = Text.cache.Atlas( overlay_size, Config.colour_player, overlay_chars )
+
+		averages = self.Averages( )
+		lines = [ ("frame", averages.get( 'total', 0 )) ]
+		for phase in phases:
+			if phase in averages:
+				lines.append( (phase, averages[phase]) )
+
+		classes = [ (ms, key[6:]) for key, ms in averages.items( ) if key.startswith( 'class:' ) ]
+		classes.sort( reverse=True )
+		for ms, name in classes[:5]:
+			lines.append( (name, ms) )
+
+		line_h = font.get_linesize( )
+		graph_h = 50
+		width = Config.profile_history + 8
+		rect = pygame.Rect( 0, 0, width, (line_h * len( lines )) + graph_h + 12 )
+		rect.bottomleft = (0, surface.get_height( ))
+
+		surface.fill( (0,0,0), rect )
+
+		y = rect.y + 4
+		for name, ms in lines:
+			label = Text.cache.Render( name, overlay_size, Config.colour_player )
+			surface.blit( label, (rect.x + 4, y) )
+			numbers.Draw( surface, "%.2fms" % ms, (rect.x + label.get_width( ) + 8, y) )
+			y += line_h
+
+		# Frame time graph, the line marks a frame at the target rate
+		base = rect.bottom - 4
+		scale = graph_h / (2000.0 / Config.fps)
+		target = base - int( (1000.0 / Config.fps) * scale )
+		pygame.draw.line( surface, Config.colour_friendly, (rect.x + 4, target), (rect.right - 4, target) )
+
+		for i, sample in enumerate( self.history ):
+			x = rect.x + 4 + i
+			h = min( int( sample['total'] * scale ), graph_h )
+			pygame.draw.line( surface, Config.colour_enemy, (x, base), (x, base - h) )
+
+		return rect
+
+
+	# Dump
+	# Write every recorded frame to a file, as JSON if the name ends in .json
+	# and CSV otherwise
+	#
+	# @param object self
+	# @param string filename
+	# @return None
+
+	def Dump( self, filename ):
+		if not self.samples:
+			return
+
+		out = open( filename, "wb" )
+		if filename.endswith( ".json" ):
+			json.dump( self.samples, out, indent=2, sort_keys=True )
+		else:
+			columns = set( )
+			for sample in self.samples:
+				columns.update( sample.keys( ) )
+			columns.discard( 'frame' )
+			columns.discard( 'total' )
+
+			ordered = ['frame', 'total'] + [ p for p in phases if p in columns ]
+			ordered += sorted( c for c in columns if c not in ordered )
+
+			writer = csv.DictWriter( out, ordered, restval=0 )
+			writer.writeheader( )
+			writer.writerows( self.samples )
+		out.close( )
\ No newline at end of file
@@ -0,0 +1,163 @@
+# -------- Replay.py --------
+# Records a game as its seed, the input events posted each tick and the length
+# of each tick, then plays it back. The simulation only depends on these, so a
+# replay runs exactly the same game again, drawn in real time or headlessly
+# as fast as it will go
+# ---------------------------
+
+# Imports
+import time, json
+import pygame
+import Config, Asset
+from Event import PygameEvent
+
+# Definitions
+version = 2
+settings = ('screen_w', 'screen_h', 'world_size', 'sim_rate', 'max_substeps', 'spore_engine') # Config that changes the simulation
+
+
+# Encode
+# A pygame event as something JSON can hold
+#
+# @param Event pe
+# @return dict
+
+def Encode( pe ):
+	data = { }
+	for key, value in pe.dict.items( ):
+		if isinstance( value, tuple ):
+			value = list( value )
+		data[ key ] = value
+	return { 'type': pe.type, 'dict': data }
+
+
+# Decode
+# @param dict e
+# @return Event
+
+def Decode( e ):
+	data = { }
+	for key, value in e['dict'].items( ):
+		if isinstance( value, list ):
+			value = tuple( value )
+		data[ str( key ) ] = value
+	return pygame.event.Event( e['type'], data )
+
+
+
+# -------- Recorder --------
+# Records the first game played. Each tick is the events posted before it
+# and its frame time
+class Recorder( ):
+
+	# Init
+	# @param object self
+	# @return object self
+
+	def __init__( self ):
+		self.seed = None
+		self.settings = { }
+		self.ticks = [ ]
+		self.done = False
+
+
+	# Tick
+	# Record a tick about to be run
+	#
+	# @param object self
+	# @param float frame_time
+	# @param list events Pygame events posted since the last tick
+	# @return None
+
+	def Tick( self, frame_time, events ):
+		if self.done:
+			return
+
+		if Config.app.mode != "Game":
+			self.done = len( self.ticks ) > 0
+			return
+
+		if not self.ticks:
+			self.seed = Config.app.seed
+			self.settings = dict( (name, getattr( Config, name )) for name in settings )
+
+		self.ticks.append( [frame_time, [ Encode( pe ) for pe in events ]] )
+
+
+	# Save
+	# @param object self
+	# @param string filename
+	# @return None
+
+	def Save( self, filename ):
+		if not self.ticks:
+			return
+
+		out = open( filename, "w" )
+		json.dump( { 'version': version, 'seed': self.seed, 'settings': self.settings, 'ticks': self.ticks }, out )
+		out.close( )
+
+
+
+# Load
+# @param string filename
+# @return dict
+
+def Load( filename ):
+	f = open( filename )
+	replay = json.load( f )
+	f.close( )
+
+	if replay.get( 'version' ) != version:
+		raise ValueError( "unsupported replay version in " + filename )
+	return replay
+
+
+# Run
+# Play a replay back. In real time each tick waits until its time has come,
+# otherwise ticks are run as fast as they can be
+#
+# @param dict replay
+# @param (optional) bool realtime
+# @return int ticks run, float seconds taken
+
+def Run( replay, realtime=False ):
+	for name, value in replay['settings'].items( ):
+		setattr( Config, str( name ), value )
+	Config.seed = replay['seed']
+
+	# The screen size comes from the preferences, and the world is made to
+	# fit it, so use the recorded one
+	Config.screen_move_x = int( Config.screen_w * 0.4 )
+	if Config.screen.get_size( ) != (Config.screen_w, Config.screen_h):
+		Config.screen = pygame.display.set_mode( [Config.screen_w, Config.screen_h], 0, Config.screen.get_bitsize( ) )
+		Asset.cache.Invalidate( )
+
+	app = Config.app
+	app.LoadGame( )
+
+	start = time.time( )
+	due = 0.0
+	run = 0
+	for frame_time, events in replay['ticks']:
+		if not app.running or app.mode != "Game":
+			break
+
+		for e in events:
+			app.em.Post( PygameEvent( Decode( e ) ) )
+		app.Tick( frame_time )
+		run += 1
+
+		if realtime:
+			due += frame_time
+			wait = due - ((time.time( ) - start) * 1000.0)
+			if wait > 0:
+				pygame.time.wait( int( wait ) )
+
+			# Only the recorded events are played, but closing the window stops
+			# the replay
+			for pe in pygame.event.get( ):
+				if pe.type == pygame.QUIT:
+					app.running = False
+
+	return run, time.time( ) - start
\ No newline at end of file
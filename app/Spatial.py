@@ -0,0 +1,137 @@
+# -------- Spatial.py --------
+# Sprite groups indexed by world x position, so collision checks only test
+# sprites in nearby cells
+# ---------------------------
+
+# Imports
+import pygame
+from collections import OrderedDict
+import Config
+
+
+# -------- Spatial Group --------
+# A sprite group that buckets its sprites into fixed width columns of the
+# world. Sprites are placed when they join and move between columns as they
+# reindex themselves each update
+class SpatialGroup( pygame.sprite.Group ):
+	pair_tests = 0 # Pair tests made by every spatial group this frame
+
+	# Init
+	# @param object self
+	# @param (optional) int cell_size
+	# @return object self
+
+	def __init__( self, cell_size=None ):
+		pygame.sprite.Group.__init__( self )
+
+		# Iterate in the order sprites joined, not by memory address, so runs
+		# with the same seed play out the same
+		self.spritedict = OrderedDict( )
+
+		if cell_size == None:
+			cell_size = Config.spatial_cell_size
+
+		self.cell_size = cell_size
+		self.cells = { }
+		self.placed = { }
+
+
+	# Add Internal
+	def add_internal( self, sprite, *args ):
+		pygame.sprite.Group.add_internal( self, sprite, *args )
+		self.Place( sprite )
+
+
+	# Remove Internal
+	def remove_internal( self, sprite ):
+		pygame.sprite.Group.remove_internal( self, sprite )
+		self.Unplace( sprite )
+
+
+	# Place
+	# Put a sprite into the cells its world position covers, moving it out of
+	# any it no longer covers
+	#
+	# @param object self
+	# @param object sprite
+	# @return None
+
+	def Place( self, sprite ):
+		# Sprites join their groups before their position is set, they are
+		# placed on their first reindex instead
+		if sprite not in self.spritedict or not hasattr( sprite, 'rect' ):
+			return
+
+		x = sprite.vector[0]
+		cells = (int( x // self.cell_size ), int( (x + sprite.rect.w) // self.cell_size ))
+
+		placed = self.placed.get( sprite )
+		if placed == cells:
+			return
+
+		if placed != None:
+			self.Unplace( sprite )
+
+		for c in range( cells[0], cells[1] + 1 ):
+			cell = self.cells.get( c )
+			if cell == None:
+				cell = self.cells[ c ] = set( )
+			cell.add( sprite )
+
+		self.placed[ sprite ] = cells
+
+
+	# Unplace
+	# Take a sprite out of every cell it is in
+	#
+	# @param object self
+	# @param object sprite
+	# @return None
+
+	def Unplace( self, sprite ):
+		placed = self.placed.pop( sprite, None )
+		if placed == None:
+			return
+
+		for c in range( placed[0], placed[1] + 1 ):
+			cell = self.cells[ c ]
+			cell.discard( sprite )
+			if not cell:
+				del self.cells[ c ]
+
+
+	# Collide
+	# Find the sprites whose rects overlap the given sprite's rect. Candidates
+	# come from the sprite's cells plus one either side, which covers any
+	# camera movement between the two rects being set this frame
+	#
+	# @param object self
+	# @param object sprite
+	# @return list
+
+	def Collide( self, sprite ):
+		x = sprite.vector[0]
+		first = int( (x - self.cell_size) // self.cell_size )
+		last = int( (x + sprite.rect.w + self.cell_size) // self.cell_size )
+
+		rect = sprite.rect
+		tested = set( )
+		collisions = [ ]
+		for c in range( first, last + 1 ):
+			cell = self.cells.get( c )
+			if cell == None:
+				continue
+
+			for s in cell:
+				if s in tested:
+					continue
+				tested.add( s )
+
+				if rect.colliderect( s.rect ):
+					collisions.append( s )
+
+		SpatialGroup.pair_tests += len( tested )
+
+		# Keep the order stable between runs
+		collisions.sort( key=lambda s: s.uid )
+		return collisions
\ No newline at end of file
@@ -0,0 +1,223 @@
+# -------- Spores.py --------
+# Optional NumPy engine that moves every spore at once. Spores stay sprites so
+# they can be drawn and collided with, but their falling, walking and ageing
+# is done here on parallel arrays instead of one update at a time
+# ---------------------------
+
+# Imports
+import Config
+from Sprite import Sprite
+
+try:
+	import numpy
+except ImportError:
+	numpy = None
+
+# Definitions
+fields = ('x', 'y', 'vx', 'vy', 'direction', 'pace', 'gravity', 'health')
+
+# Spore states
+AIR = 0
+LOOKING = 1
+GROWING = 2
+
+
+# -------- Spore Engine --------
+class SporeEngine( ):
+
+	# Init
+	# @param object self
+	# @param (optional) int capacity
+	# @return object self
+
+	def __init__( self, capacity=256 ):
+		self.sprites = [ ] # Sprite in each slot
+		self.capacity = capacity
+
+		for f in fields:
+			setattr( self, f, numpy.zeros( capacity ) )
+		self.state = numpy.zeros( capacity, numpy.int8 )
+
+		# Ground below every pixel of the world, filled a chunk at a time
+		self.chunks = None
+		self.known = set( )
+		self.heights = None
+		self.water = None
+		self.ground_changes = 0
+
+
+	# Add
+	# Take over moving a spore
+	#
+	# @param object self
+	# @param object sprite
+	# @return None
+
+	def Add( self, sprite ):
+		i = len( self.sprites )
+		if i == self.capacity:
+			self.Grow( )
+
+		self.x[i], self.y[i] = sprite.vector
+		self.vx[i], self.vy[i] = sprite.move_vector
+		self.direction[i] = sprite.direction
+		self.pace[i] = sprite.speed * sprite.walk
+		self.gravity[i] = sprite.gravity
+		self.health[i] = sprite.health
+
+		if sprite.growing:
+			self.state[i] = GROWING
+		elif sprite.looking:
+			self.state[i] = LOOKING
+		else:
+			self.state[i] = AIR
+
+		sprite.slot = i
+		self.sprites.append( sprite )
+
+
+	# Remove
+	# Stop moving a spore, the last spore is moved into its slot
+	#
+	# @param object self
+	# @param object sprite
+	# @return None
+
+	def Remove( self, sprite ):
+		i = sprite.slot
+		last = len( self.sprites ) - 1
+
+		if i != last:
+			for f in fields + ('state',):
+				a = getattr( self, f )
+				a[i] = a[last]
+			moved = self.sprites[i] = self.sprites[last]
+			moved.slot = i
+
+		self.sprites.pop( )
+		sprite.slot = None
+
+
+	# Grow
+	# Double the room in every array
+	def Grow( self ):
+		for f in fields + ('state',):
+			a = getattr( self, f )
+			setattr( self, f, numpy.concatenate( (a, numpy.zeros_like( a )) ) )
+		self.capacity *= 2
+
+
+	# Load Ground
+	# Make sure the ground is known below the given positions, generating any
+	# chunks of terrain that have not been yet
+	#
+	# @param object self
+	# @param ndarray xi
+	# @return None
+
+	def LoadGround( self, xi ):
+		world = Config.world
+
+		# A new terrain has been generated
+		if self.chunks is not world.chunks:
+			self.chunks = world.chunks
+			self.known = set( )
+			size = ((world.width // world.chunk_width) + 1) * world.chunk_width
+			self.heights = numpy.zeros( size )
+			self.water = numpy.zeros( size, bool )
+			self.ground_changes = world.ground_changes
+
+		for c in numpy.unique( xi // world.chunk_width ).tolist( ):
+			if c not in self.known:
+				chunk = world.Chunk( c )
+				self.heights[ chunk.x1:chunk.x2 ] = chunk.height
+				self.LoadWater( chunk )
+				self.known.add( c )
+
+		# Segments have changed type since the water was loaded
+		if self.ground_changes != world.ground_changes:
+			self.ground_changes = world.ground_changes
+			for c in self.known:
+				self.LoadWater( world.Chunk( c ) )
+
+
+	# Load Water
+	def LoadWater( self, chunk ):
+		water = numpy.array( [ t[4] == 'water' for t in chunk.types ], bool )
+		self.water[ chunk.x1:chunk.x2 ] = water[ numpy.array( chunk.segment ) ]
+
+
+	# Step
+	# Move every spore on by one step, the same way a spore's own update
+	# would
+	#
+	# @param object self
+	# @param float frame_time
+	# @return None
+
+	def Step( self, frame_time ):
+		n = len( self.sprites )
+		if n == 0:
+			return
+
+		m = frame_time / 1000.0
+		t = frame_time * Sprite.tuned_rate / 1000.0
+		width = Config.world.width
+
+		x, y = self.x[:n], self.y[:n]
+		vx, vy = self.vx[:n], self.vy[:n]
+		direction, state = self.direction[:n], self.state[:n]
+
+		# Turn around at the ends of the world
+		edge = (x <= 0) | (x >= width)
+		direction[ edge ] *= -1
+		numpy.clip( x, 0, width, out=x )
+
+		# Ground below
+		xi = x.astype( int )
+		self.LoadGround( xi )
+		ground = self.heights[ xi ] - 6
+
+		# Fall until the ground is reached
+		air = state == AIR
+		falling = air & (y < ground)
+		landed = air & ~falling
+		walking = state == LOOKING
+
+		vy[ falling ] += self.gravity[:n][ falling ] * m
+		x[ falling ] += vx[ falling ] * t
+		y[ falling ] += vy[ falling ] * t
+		state[ landed ] = LOOKING
+
+		# Follow the ground while looking for water
+		below = walking & (y < ground)
+		above = walking & (y > ground)
+		y[ below ] += t
+		y[ above ] -= t
+		x[ walking ] += self.pace[:n][ walking ] * direction[ walking ] * m
+
+		self.health[:n] -= m
+
+		# Hand positions back to the sprites
+		for s, sx, sy in zip( self.sprites, x.tolist( ), y.tolist( ) ):
+			s.vector = [sx, sy]
+
+		for i in numpy.nonzero( landed )[0].tolist( ):
+			self.sprites[i].looking = True
+
+		# Spores on water settle there, which can kill whole stacks of them
+		xi = numpy.clip( x, 0, width ).astype( int )
+		settling = (state == LOOKING) & self.water[ xi ]
+		for s in [ self.sprites[i] for i in numpy.nonzero( settling )[0].tolist( ) ]:
+			if s.slot == None:
+				continue
+
+			s.CheckOnWater( )
+			if s.slot != None and s.growing:
+				self.state[ s.slot ] = GROWING
+				self.x[ s.slot ], self.y[ s.slot ] = s.vector
+
+		n = len( self.sprites )
+		for s in [ self.sprites[i] for i in numpy.nonzero( self.health[:n] <= 0 )[0].tolist( ) ]:
+			if s.slot != None:
+				s.kill( )
\ No newline at end of file
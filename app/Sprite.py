@@ -4,34 +4,110 @@
 
 # Imports
 import pygame
-import Vector2D, Event, Config
-
-# Definitions
-folder = "sprites/"
+import Vector2D, Config, Asset
+from Spatial import SpatialGroup
 
 
 # -------- Sprite -------
 class Sprite( pygame.sprite.Sprite ):
 	collide_with = []
+	next_uid = 0
+	ground = None
+	prev_vector = None # Position at the start of the last step, for drawing between steps
+	listeners = () # Event listeners kept alive by this sprite
+	tuned_rate = 60.0 # Amounts given per tick were tuned at this many ticks per second
 
 	# Init
 	def __init__( self ):
+		# Give every sprite an id so ordering does not depend on memory address
+		self.uid = Sprite.next_uid
+		Sprite.next_uid += 1
+
+		self.indexed = [ g for g in self.groups if isinstance( g, SpatialGroup ) ]
+
 		pygame.sprite.Sprite.__init__( self, self.groups )
 
+	# New
+	# Make a sprite of this class, reusing a killed one when the class is
+	# pooled
+	@classmethod
+	def New( cls, *args ):
+		pool = Config.app.pools.get( cls )
+		if pool == None:
+			return cls( *args )
+		return pool.Acquire( *args )
+
+	# Rejoin
+	# Go back into the sprite's groups at its new position, once a pooled
+	# sprite has been reset
+	def Rejoin( self ):
+		self.prev_vector = None
+		self.ground = None
+
+		self.rect.x = self.GetDrawPos(0)
+		self.rect.y = self.GetDrawPos(1)
+		if not self.alive( ):
+			self.add( self.groups )
+		self.Reindex( )
+
+	# Kill
+	# Leave every group, and let go of listeners so they stop hearing events
+	# once no other sprite needs them. Pooled sprites go back to their pool
+	def kill( self ):
+		if self.alive( ):
+			pool = Config.app.pools.get( self.__class__ )
+			if pool != None:
+				pool.Release( self )
+
+		self.listeners = ()
+		pygame.sprite.Sprite.kill( self )
+
+	# Reindex
+	# Move to the right cells of every spatially indexed group we are in
+	def Reindex( self ):
+		for g in self.indexed:
+			g.Place( self )
+
 	# Check collisions
+	# Collision events are queued and posted together once the tick's updates
+	# are done
 	def CheckCollisions( self ):
 		for cw in self.collide_with:
-			collisions = pygame.sprite.spritecollide( self, cw['group'], False )
+			collisions = cw['group'].Collide( self )
 			for c in collisions:
-				f = getattr( Event, cw['event'] )
 				self.OnCollision( c )
-				Config.app.em.Post( f( c ) )
+				Config.app.em.Queue( cw['event'], c, self )
 
 	# On Collision
 	def OnCollision( self, c ):
 		pass
 
 
+	# Tick Scale
+	# How many tuned ticks a step covers, amounts given per tick are multiplied
+	# by this so they behave the same at any simulation rate
+	def TickScale( self, frame_time ):
+		return frame_time * self.tuned_rate / 1000.0
+
+
+	# Ground X
+	# Where the ground below this sprite is looked up
+	def GroundX( self ):
+		return self.vector[0]
+
+
+	# Get Ground
+	# Height and angle of the ground below, taken from the batched lookup made
+	# for this tick when there is one
+	def GetGround( self ):
+		ground = self.ground
+		if ground == None:
+			return Config.world.GroundInfo( self.GroundX( ) )
+
+		self.ground = None
+		return ground
+
+
 	# Get Draw Pos
 	def GetDrawPos( self, i=None ):
 		if i == None:
@@ -52,16 +128,18 @@ class StaticSprite( Sprite ):
 		Sprite.__init__( self )
 
 		self.vector = vector
-		self.image = pygame.image.load( folder+src ).convert_alpha( )
+		self.image = Asset.cache.Image( src )
 		self.rect = self.image.get_rect( )
 		self.rect.x = self.GetDrawPos(0)
 		self.rect.y = self.GetDrawPos(1)
+		self.Reindex( )
 
 
 	# Update
 	def Update( self, frame_time, ticks ):
 		self.rect.x = self.GetDrawPos(0)
 		self.rect.y = self.GetDrawPos(1)
+		self.Reindex( )
 
 		self.CheckCollisions( )
 
@@ -73,6 +151,11 @@ class AnimatedSprite( Sprite ):
 	visible = True
 	image_angle = False
 
+	# Evolution stages, each a dict of 'src', 'states' and an optional 'energy'
+	# threshold that has to be passed to reach it
+	stages = []
+	stage = 0
+
 	# Init
 	def __init__( self, src, vector ):
 		Sprite.__init__( self )
@@ -82,7 +165,8 @@ class AnimatedSprite( Sprite ):
 		self.states = { }
 		self.vector = vector
 
-		self.src_image = pygame.image.load( folder+src ).convert_alpha( )
+		self.src = src
+		self.src_image = Asset.cache.Image( src )
 		self.src_width, self.src_height = self.src_image.get_size( )
 
 		self._last_update = 0
@@ -90,12 +174,23 @@ class AnimatedSprite( Sprite ):
 		self.state = ''
 
 
+	# Rejoin
+	# Start the animation over as well
+	def Rejoin( self ):
+		if self.state:
+			self._frame = self.states[self.state]['start']
+			self._last_update = 0
+			self.image = self.images[self._frame]
+		Sprite.Rejoin( self )
+
+
 	# Reload Source
 	def ReloadSrc( self, src ):
 		self.loaded = False
 		self.images = [ ]
 
-		self.src_image = pygame.image.load( folder+src ).convert_alpha( )
+		self.src = src
+		self.src_image = Asset.cache.Image( src )
 		self.src_width, self.src_height = self.src_image.get_size( )
 
 		state = self.state
@@ -103,6 +198,77 @@ class AnimatedSprite( Sprite ):
 		self.SetAnimationState( state )
 
 
+	# Prebake
+	# Decode and split every stage sheet up front, so evolving is only a swap
+	# of frame lists
+
+	@classmethod
+	def Prebake( cls ):
+		for stage in cls.stages:
+			frames = 0
+			for name, start, end, fps in stage['states']:
+				frames += (end - start + 1)
+			Asset.cache.Frames( stage['src'], frames )
+
+
+	# Set Stage
+	# Swap to the frames of an evolution stage, this does nothing if the stage
+	# is already showing
+	#
+	# @param object self
+	# @param int level
+	# @return None
+
+	def SetStage( self, level ):
+		if self.stage == level:
+			return
+
+		stage = self.stages[ level - 1 ]
+		self.stage = level
+
+		self.frames = 0
+		self.states = { }
+		for name, start, end, fps in stage['states']:
+			self.AddAnimationState( name, start, end, fps )
+
+		self.src = stage['src']
+		self.src_image = Asset.cache.Image( self.src )
+		self.src_width, self.src_height = self.src_image.get_size( )
+		self.frame_width = self.src_width / self.frames
+		self.images = Asset.cache.Frames( self.src, self.frames )
+		self.loaded = True
+
+		# Keep the current state and frame if the new stage has them
+		if self.state not in self.states:
+			self.state = ''
+			self.SetAnimationState( stage['states'][0][0] )
+
+		self.image = self.images[ self._frame ]
+		self.rect = self.image.get_rect( )
+		self.rect.x = self.GetDrawPos(0)
+		self.rect.y = self.GetDrawPos(1)
+		self.Reindex( )
+
+
+	# Evolve
+	# Move up through the stages whose energy threshold has been passed
+	#
+	# @param object self
+	# @return None
+
+	def Evolve( self ):
+		level = self.stage
+		while level < len( self.stages ):
+			threshold = self.stages[level].get( 'energy' )
+			if threshold == None or self.energy <= threshold:
+				break
+			level += 1
+
+		if level != self.stage:
+			self.level = level
+			self.SetStage( level )
+
+
 	# Add Animation State
 	def AddAnimationState( self, name, start, end, fps ):
 		self.frames += (end - start + 1)
@@ -119,16 +285,17 @@ class AnimatedSprite( Sprite ):
 		if self.state != name:
 			# Check if the files have been loaded
 			if self.loaded == False:
-				# Calculate frame width and split frames
+				# Get the shared split frames for this sheet
 				self.frame_width = self.src_width / self.frames
-				for i in range( self.frames ):
-					self.images.append( self.src_image.subsurface(i * self.frame_width, 0, self.frame_width, self.src_height) )
+				self.images = Asset.cache.Frames( self.src, self.frames )
+				self.loaded = True
 
 				# Set image
 				self.image = self.images[0]
 				self.rect = self.image.get_rect( )
 				self.rect.x = self.GetDrawPos(0)
 				self.rect.y = self.GetDrawPos(1)
+				self.Reindex( )
 
 			# Set state
 			self.state = name
@@ -144,6 +311,7 @@ class AnimatedSprite( Sprite ):
 		# Update vector position
 		self.rect.x = self.GetDrawPos(0) #self.vector[0]
 		self.rect.y = self.GetDrawPos(1)
+		self.Reindex( )
 
 		# Check if enough ticks have passed to update animation
 		if ticks - self._last_update > state['delay']:
@@ -173,35 +341,53 @@ class AnimatedSprite( Sprite ):
 
 
 # -------- Moving Sprite --------
+# Speeds and limits on the class are shared by every sprite of that class and
+# never changed. What changes as a sprite moves is kept on the sprite itself
 class MovingSprite( AnimatedSprite ):
 	max_speed 	= [100.0, 100.0] # Pixels per second
-	cur_speed 	= [0.0, 0.0]
 	accl 		= [20.0, 20.0] # Change per second
 	dccl		= [10.0, 10.0]
-	is_accl 	= [0, 0]
+
+	# Init
+	def __init__( self, src, vector ):
+		self.cur_speed = [0.0, 0.0]
+		self.is_accl = [0, 0]
+		self.move_vector = [0.0, 0.0]
+
+		AnimatedSprite.__init__( self, src, vector )
+
 
 	# Move
 	def Move( self, frame_time ):
 		m = frame_time / 1000.0
+		t = self.TickScale( frame_time )
 
-		for i in range( 2 ):
-			if self.is_accl[i] != 0:
-				self.cur_speed[i] += self.accl[i] * self.is_accl[i]
+		cur_speed = self.cur_speed
+		is_accl = self.is_accl
+		move_vector = self.move_vector
 
-				if self.cur_speed[i] > self.max_speed[i]: self.cur_speed[i] = self.max_speed[i]
-				if self.cur_speed[i] < -self.max_speed[i]: self.cur_speed[i] = -self.max_speed[i]
+		for i in (0, 1):
+			speed = cur_speed[i]
+			if is_accl[i] != 0:
+				speed += self.accl[i] * is_accl[i] * t
 
-			else:
-				if self.cur_speed[i] > 0:
-					self.cur_speed[i] -= self.dccl[i]
-					if self.cur_speed[i] < self.dccl[i]: self.cur_speed[i] = 0.0
-				elif self.cur_speed[i] < 0:
-					self.cur_speed[i] += self.dccl[i]
-					if self.cur_speed[i] > self.dccl[i]: self.cur_speed[i] = 0.0
-
-			self.move_vector[i] = self.cur_speed[i] * m
+				max_speed = self.max_speed[i]
+				if speed > max_speed: speed = max_speed
+				if speed < -max_speed: speed = -max_speed
 
-		self.vector = Vector2D.AddVectors( self.vector, self.move_vector )
+			else:
+				dccl = self.dccl[i] * t
+				if speed > 0:
+					speed -= dccl
+					if speed < dccl: speed = 0.0
+				elif speed < 0:
+					speed += dccl
+					if speed > dccl: speed = 0.0
+
+			cur_speed[i] = speed
+			move_vector[i] = speed * m
+
+		self.vector = [self.vector[0] + move_vector[0], self.vector[1] + move_vector[1]]
 
 
 	# Update
@@ -0,0 +1,182 @@
+# -------- Targeting.py --------
+# Matches enemy flyers to the friendly plants they hunt. Plants that are free
+# to be hunted are kept ordered by x so the nearest can be found quickly, and
+# every reservation is made and released here
+# ---------------------------
+
+# Imports
+from bisect import bisect_left
+
+
+# -------- Plant Index --------
+# Plants ordered by the x position they were filed under
+class PlantIndex( ):
+
+	# Init
+	# @param object self
+	# @param (optional) list plants
+	# @return object self
+
+	def __init__( self, plants=[] ):
+		self.entries = [ ]
+		self.xs = [ ]
+		self.filed = { } # Entry of each plant in the index
+
+		for p in plants:
+			self.Add( p )
+
+
+	# Add
+	def Add( self, plant ):
+		entry = self.filed[ plant ] = (plant.vector[0], plant.uid, plant)
+		i = bisect_left( self.entries, entry )
+		self.entries.insert( i, entry )
+		self.xs.insert( i, entry[0] )
+
+
+	# Remove
+	# Take a plant out, wherever it has moved since it was added
+	def Remove( self, plant ):
+		entry = self.filed.pop( plant, None )
+		if entry == None:
+			return
+
+		i = bisect_left( self.entries, entry )
+		del self.entries[i]
+		del self.xs[i]
+
+
+	# Filed
+	# Whether a plant is in the index at its current x position
+	def Filed( self, plant ):
+		entry = self.filed.get( plant )
+		return entry != None and entry[0] == plant.vector[0]
+
+
+	# Nearest
+	# The plant closest to an x position, or None if there are none
+	#
+	# @param object self
+	# @param float x
+	# @return object
+
+	def Nearest( self, x ):
+		i = bisect_left( self.xs, x )
+
+		best = None
+		for j in (i - 1, i):
+			if 0 <= j < len( self.xs ):
+				if best == None or abs( self.xs[j] - x ) < abs( self.xs[best] - x ):
+					best = j
+
+		if best == None:
+			return None
+		return self.entries[best][2]
+
+
+	# Length
+	def __len__( self ):
+		return len( self.entries )
+
+
+
+# -------- Targets --------
+# Reservations of plants by flyers. A reserved plant has targeted set and
+# targeted_by pointing at its flyer, and the flyer's target is the plant.
+# Plants that can be hunted are kept indexed as they change, rather than
+# indexed again every tick
+class Targets( ):
+
+	# Init
+	# @param object self
+	# @return object self
+
+	def __init__( self ):
+		self.index = PlantIndex( )
+
+
+	# Place
+	# File a plant again after it has moved, changed state, been reserved,
+	# released or killed
+	#
+	# @param object self
+	# @param object plant
+	# @return None
+
+	def Place( self, plant ):
+		available = self.Available( plant )
+		if available and self.index.Filed( plant ):
+			return
+
+		self.index.Remove( plant )
+		if available:
+			self.index.Add( plant )
+
+
+	# Reserve
+	# @param object self
+	# @param object flyer
+	# @param object plant
+	# @return None
+
+	def Reserve( self, flyer, plant ):
+		self.Release( flyer )
+
+		plant.targeted = True
+		plant.targeted_by = flyer
+		flyer.target = plant
+		self.index.Remove( plant )
+
+
+	# Release
+	# Give up a flyer's plant, if it has one
+	#
+	# @param object self
+	# @param object flyer
+	# @return None
+
+	def Release( self, flyer ):
+		plant = flyer.target
+		flyer.target = False
+
+		if plant and plant.targeted_by is flyer:
+			plant.targeted = False
+			plant.targeted_by = None
+			self.Place( plant )
+
+
+	# Huntable
+	# Whether a plant can be hunted at all, reserved or not
+	def Huntable( self, plant ):
+		return plant.alive( ) and plant.state == "eating"
+
+
+	# Available
+	# Whether a plant can be hunted and is not already reserved
+	def Available( self, plant ):
+		return self.Huntable( plant ) and plant.targeted == False
+
+
+	# Assign
+	# Let go of plants that can no longer be hunted, then give every flyer
+	# without a plant the nearest free one, each plant going to one flyer.
+	# Made once a tick for all flyers
+	#
+	# @param object self
+	# @param Group flyers
+	# @return None
+
+	def Assign( self, flyers ):
+		hunting = [ ]
+		for flyer in flyers:
+			if flyer.target and not self.Huntable( flyer.target ):
+				self.Release( flyer )
+			if flyer.target == False:
+				hunting.append( flyer )
+
+		for flyer in hunting:
+			if not len( self.index ):
+				break
+
+			plant = self.index.Nearest( flyer.vector[0] + (flyer.rect.w / 2) )
+			self.Reserve( flyer, plant )
\ No newline at end of file
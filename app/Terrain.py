@@ -0,0 +1,148 @@
+# -------- Terrain.py --------
+# Seeded terrain generation, one fixed width chunk at a time. A chunk only
+# depends on the seed and its own index, so chunks can be generated in any
+# order and always come out the same
+# ---------------------------
+
+# Imports
+import random, math
+from array import array
+import Config
+
+# Definitions
+rx = 50 # Widest a segment can be
+rwater = 20 # % chance of being a water source
+
+
+# -------- Terrain Chunk --------
+class TerrainChunk( ):
+
+	# Init
+	# @param object self
+	# @param int index
+	# @param int x1
+	# @param int width
+	# @return object self
+
+	def __init__( self, index, x1, width ):
+		self.index = index
+		self.x1 = x1
+		self.x2 = x1 + width
+
+		self.lines = [ ] # x1, y1, x2, y2, type as generated
+		self.types = [ ] # x1, x2, xc, ym, type as the ground is now
+		self.segment = array( 'i' ) # Index into types for each pixel
+		self.height = array( 'f' )
+		self.angle = array( 'f' )
+
+
+	# Add Segment
+	# Add a straight piece of ground, covering pixels x1 <= x < x2
+	#
+	# @param object self
+	# @param int x1, y1, x2, y2
+	# @param string terrain_type
+	# @return None
+
+	def AddSegment( self, x1, y1, x2, y2, terrain_type ):
+		delta_y = y1 - y2
+		delta_x = x2 - x1
+		angle = math.degrees( math.atan2(delta_y, delta_x) )
+
+		xc = x1 + ((x2 - x1) / 2 )
+		ym = y1 + ((y2 - y1) / 2 )
+
+		self.segment.extend( [len( self.types )] * (x2 - x1) )
+		self.types.append( (x1, x2, xc, ym, terrain_type) )
+		self.lines.append( (x1, y1, x2, y2, terrain_type) )
+
+		for i in range( x1, x2 ):
+			ym = y1 + ((y2 - y1) * float(float(i - x1) / float(x2 - x1)))
+
+			self.height.append( ym )
+			self.angle.append( angle )
+
+
+
+# -------- Terrain Generator --------
+class TerrainGenerator( ):
+
+	# Init
+	# @param object self
+	# @param int seed
+	# @return object self
+
+	def __init__( self, seed ):
+		self.seed = seed
+		self.chunk_width = Config.terrain_chunk_width
+		self.ry = Config.screen_h / 40
+
+
+	# Random
+	# Get a random generator seeded from the world seed and a key, so each
+	# part of the terrain has its own independent stream
+	#
+	# @param object self
+	# @param any key
+	# @return Random
+
+	def Random( self, *key ):
+		return random.Random( "%s:%s" % (self.seed, ":".join( [str(k) for k in key] )) )
+
+
+	# Anchor
+	# Height of the ground where a chunk starts, which is also where the chunk
+	# before it ends
+	#
+	# @param object self
+	# @param int c
+	# @return int
+
+	def Anchor( self, c ):
+		if c == 0:
+			return Config.screen_h - (self.ry * 4)
+		return self.Random( 'anchor', c ).randint( Config.screen_h / 3, Config.screen_h - self.ry )
+
+
+	# Chunk
+	# Generate a chunk of terrain
+	#
+	# @param object self
+	# @param int c
+	# @return TerrainChunk
+
+	def Chunk( self, c ):
+		ry = self.ry
+		rng = self.Random( c )
+		chunk = TerrainChunk( c, c * self.chunk_width, self.chunk_width )
+
+		# Random walk across the chunk
+		y_start = self.Anchor( c )
+		y_end = self.Anchor( c + 1 )
+
+		x = chunk.x1
+		y = y_start
+		points = [ [x, y] ]
+		while x < chunk.x2:
+			x = rng.randint( x+10, x+rx+1 )
+			if x > chunk.x2 - 10: x = chunk.x2
+			y = rng.randint( y-ry, y+ry )
+			points.append( [x, y] )
+
+		# Bend the walk so it meets the next chunk's anchor
+		drift = y_end - y
+		for p in points[1:]:
+			p[1] += int( drift * (float(p[0] - chunk.x1) / float(self.chunk_width)) )
+			if p[1] > Config.screen_h - ry: p[1] = Config.screen_h - ry
+			if p[1] < ry: p[1] = ry
+		points[-1][1] = y_end
+
+		for i in range( len( points ) - 1 ):
+			if rng.randint( 0, 100 ) <= rwater:
+				terrain_type = 'water'
+			else:
+				terrain_type = 'dirt'
+
+			chunk.AddSegment( points[i][0], points[i][1], points[i+1][0], points[i+1][1], terrain_type )
+
+		return chunk
\ No newline at end of file
@@ -0,0 +1,145 @@
+# -------- Text.py --------
+# Fonts opened once and text rendered once. Fixed strings are kept as rendered
+# surfaces, while numbers that change often are drawn from an atlas of glyphs
+# ---------------------------
+
+# Imports
+from collections import OrderedDict
+import pygame
+import Config
+
+# Definitions
+font_name = "Arial"
+digits = "0123456789-"
+
+
+# -------- Text Cache --------
+class TextCache( ):
+
+	# Init
+	# @param object self
+	# @return object self
+
+	def __init__( self ):
+		self.fonts = { }
+		self.rendered = OrderedDict( ) # Oldest first, so the least used can go
+		self.atlases = { }
+		self.hits = 0
+		self.misses = 0
+
+
+	# Font
+	# Get a font, opening it the first time its size is asked for
+	#
+	# @param object self
+	# @param int size
+	# @return Font
+
+	def Font( self, size ):
+		font = self.fonts.get( size )
+		if font == None:
+			if not pygame.font.get_init( ):
+				pygame.font.init( )
+			font = self.fonts[ size ] = pygame.font.SysFont( font_name, size )
+		return font
+
+
+	# Render
+	# Get a string rendered in a size and colour. Only the most recently used
+	# strings are kept, see Config.text_cache
+	#
+	# @param object self
+	# @param string text
+	# @param int size
+	# @param tuple colour
+	# @return Surface
+
+	def Render( self, text, size, colour ):
+		key = (text, size, colour)
+		surface = self.rendered.pop( key, None )
+		if surface == None:
+			self.misses += 1
+			surface = self.Font( size ).render( text, False, colour )
+			if len( self.rendered ) >= Config.text_cache:
+				self.rendered.popitem( last=False )
+		else:
+			self.hits += 1
+
+		self.rendered[ key ] = surface
+		return surface
+
+
+	# Atlas
+	# Get the glyph atlas for a size and colour
+	#
+	# @param object self
+	# @param int size
+	# @param tuple colour
+	# @param (optional) string chars
+	# @return GlyphAtlas
+
+	def Atlas( self, size, colour, chars=digits ):
+		key = (size, colour, chars)
+		atlas = self.atlases.get( key )
+		if atlas == None:
+			atlas = self.atlases[ key ] = GlyphAtlas( self.Font( size ), colour, chars )
+		return atlas
+
+
+
+# -------- Glyph Atlas --------
+# A set of characters rendered side by side on one surface. Text made of
+# those characters is drawn by blitting each glyph, without rendering
+class GlyphAtlas( ):
+
+	# Init
+	# @param object self
+	# @param Font font
+	# @param tuple colour
+	# @param string chars
+	# @return object self
+
+	def __init__( self, font, colour, chars ):
+		self.glyphs = { }
+
+		x = 0
+		for c in chars:
+			w = font.size( c )[0]
+			self.glyphs[ c ] = pygame.Rect( x, 0, w, font.get_height( ) )
+			x += w
+
+		self.height = font.get_height( )
+		self.surface = pygame.Surface( (max( x, 1 ), self.height), pygame.SRCALPHA )
+		for c in chars:
+			self.surface.blit( font.render( c, False, colour ), self.glyphs[ c ] )
+
+
+	# Size
+	# Width and height of a string drawn from the atlas
+	#
+	# @param object self
+	# @param string text
+	# @return tuple
+
+	def Size( self, text ):
+		return sum( self.glyphs[ c ].w for c in text ), self.height
+
+
+	# Draw
+	# @param object self
+	# @param Surface surface
+	# @param string text Made only of characters in the atlas
+	# @param tuple pos
+	# @return Rect
+
+	def Draw( self, surface, text, pos ):
+		x, y = pos
+		for c in text:
+			glyph = self.glyphs[ c ]
+			surface.blit( self.surface, (x, y), glyph )
+			x += glyph.w
+		return pygame.Rect( pos, (x - pos[0], self.height) )
+
+
+# Process wide cache
+cache = TextCache( )
\ No newline at end of file
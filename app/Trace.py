@@ -0,0 +1,36 @@
+# -------- Trace.py --------
+# Startup trace, timing importing, initialising, loading assets and making the
+# terrain up to the first frame. Printed as it goes when Config.trace is set
+# ---------------------------
+
+# Imports
+import time
+import Config
+
+# Definitions
+started = { } # Start time of each span still running
+spans = [ ] # Name and milliseconds of every finished span, in order
+
+
+# Begin
+# @param string name
+# @return None
+
+def Begin( name ):
+	started[ name ] = time.time( )
+
+
+# End
+# Finish a span, does nothing if it was never begun or has already ended
+#
+# @param string name
+# @return None
+
+def End( name ):
+	if name not in started:
+		return
+
+	ms = (time.time( ) - started.pop( name )) * 1000.0
+	spans.append( (name, ms) )
+	if Config.trace:
+		print "startup: %s %.1fms" % (name, ms)
\ No newline at end of file
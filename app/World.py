@@ -3,90 +3,98 @@
 # --------------------------
 
 # Imports
-import random, math, pygame
+import random, math, threading, traceback, pygame
+from collections import OrderedDict
 import Config
+from Terrain import TerrainGenerator
 from Sprite import StaticSprite
-from Event import EventListener
+from Event import EventListener, PygameEvent
 from Friendly import FriendlyPlant, FriendlyTree
 from Enemy import EnemyTree, EnemyFlying
+from Player import Player, EnergyParticle
 
 
 # -------- World --------
 class World( ):
-	terrain_height = []
-	terrain_angle = []
-	terrain_type = []
+	chunks = {} # Generated terrain chunks by index
+	ground_counts = {} # Number of generated terrain segments of each ground type
+	ground_changes = 0 # Times a segment has changed type
 	colour = {}
 
 	# Init
 	def __init__( self ):
-		Config.app.em.RegisterListener( WorldKeyboardListener() )
-
 		self.colour['dirt'] = (255, 200, 0)
 		self.colour['water'] = (0, 200, 255)
 		self.colour['friendly'] = (140, 255, 0)
 
 
 	# Generate Terrain
-	def GenerateTerrain( self, width ):
-		rx = 50
-		ry = Config.screen_h / 40
-		rwater = 20 # % chance of being a water source
-
-		# Create terrain surface
-		self.terrain = pygame.Surface( (width, Config.screen_h) )
-		self.terrain_height = []
-		self.terrain_angle = []
-		self.terrain_type = []
-
-		w = 0
-		x1 = x2 = 0
-		y1 = y2 = Config.screen_h - (ry * 4)
-		while x2 < width:
-			x2 = random.randint( x1+10, x1+rx+1 )
-			y2 = random.randint( y1-ry, y1+ry )
-
-			if y2 > Config.screen_h - ry: y2 = Config.screen_h - ry
-			if y2 < ry: y2 = ry
-
-			if random.randint( 0, 100 ) <= rwater:
-				terrain_type = 'water'
-				pygame.draw.line( self.terrain, self.colour['water'], (x1, y1), (x2, y2) )
-				pygame.draw.line( self.terrain, self.colour['water'], (x1, y1+1), (x2, y2+1) )
-				pygame.draw.line( self.terrain, self.colour['water'], (x1, y1+2), (x2, y2+2) )
-			else:
-				terrain_type = 'dirt'
-				pygame.draw.line( self.terrain, self.colour['dirt'], (x1, y1), (x2, y2) )
-
-			delta_y = y1 - y2
-			delta_x = x2 - x1
-			angle = math.degrees( math.atan2(delta_y, delta_x) )
-
-			xc = x1 + ((x2 - x1) / 2 )
-			ym = y1 + ((y2 - y1) / 2 )
-			self.terrain_type.append( (x1, x2, xc, ym, terrain_type) )
-
-			for i in range( x1, x2 ):
-				ym = y1 + ((y2 - y1) * float(float(i - x1) / float(x2 - x1)))
-
-				self.terrain_height.append( ym )
-				self.terrain_angle.append( angle )
-
-			x1 = x2
-			y1 = y2
-
-		# Create minimap
-		self.terrain_minimap = self.terrain.copy( )
-
+	# Start a new terrain, its chunks are generated as they are first needed
+	#
+	# @param object self
+	# @param int width
+	# @param (optional) int seed
+	# @return None
+
+	def GenerateTerrain( self, width, seed=None ):
+		self.Prepare( width, seed )
+		self.Populate( )
+
+
+	# Prepare
+	# Set up a new terrain and its minimap, without adding any sprites. Safe to
+	# run away from the main thread, as it only touches this world
+	#
+	# @param object self
+	# @param int width
+	# @param (optional) int seed
+	# @return None
+
+	def Prepare( self, width, seed=None ):
+		if seed == None:
+			seed = Config.seed
+		if seed == None:
+			seed = random.randint( 0, 1 << 30 )
+
+		self.seed = seed
+		self.width = width
+		self.generator = TerrainGenerator( seed )
+		self.chunk_width = self.generator.chunk_width
+		self.chunks = { }
+		self.ground_counts = { 'water': 0, 'dirt': 0, 'friendly': 0, 'enemy': 0 }
+		self.stacks = { } # Spores growing on each water hole, by class and segment
+
+		# Terrain is drawn on demand into tiles from its lines
+		self.tiles = OrderedDict( )
+
+		# Create minimap, chunks are drawn onto it as they are generated
 		wscale = int( Config.screen_w * 0.6 )
 		hscale = int( (Config.screen_h / Config.world_size) * 0.6 )
 
-		self.terrain_minimap = pygame.transform.scale( self.terrain_minimap, (wscale , hscale) )
+		self.terrain_minimap = pygame.Surface( (wscale, hscale) )
+		self.minimap_scale_w = float( wscale ) / float( width )
+		self.minimap_scale_h = float( hscale ) / float( Config.screen_h )
+
+		# Create the nav map layer drawn over the minimap
+		self.navmap = pygame.Surface( (wscale, hscale) )
+		self.navmap.set_colorkey( (0,0,0) )
+		self.navmap_refreshed = None
+
 
-		# Add starting positions
+	# Populate
+	# Add the starting plant and trees, and start listening for keys
+	#
+	# @param object self
+	# @return None
+
+	def Populate( self ):
+		self.listener = Config.app.em.RegisterListener( WorldKeyboardListener() )
+
+		# Add starting positions, working in from each end of the world until
+		# enough water holes have been found
 		FriendlyPlant( )
 		num_trees = 3
-		for x1, x2, xc, ym, t in self.terrain_type:
+		for x1, x2, xc, ym, t in self.Segments( ):
 			if t == "water":
 				num_trees -= 1
 				tree = FriendlyTree( [xc, ym - 80] )
@@ -95,7 +103,7 @@ class World( ):
 					break;
 
 		num_trees = 6
-		for x1, x2, xc, ym, t in reversed( self.terrain_type ):
+		for x1, x2, xc, ym, t in self.Segments( True ):
 			if t == "water":
 				num_trees -= 1
 				tree = EnemyTree( [xc, ym - 80] )
@@ -107,58 +115,98 @@ class World( ):
 					break;
 
 
+	# Chunk
+	# Get a chunk of terrain, generating it the first time it is needed
+	#
+	# @param object self
+	# @param int c
+	# @return TerrainChunk
+
+	def Chunk( self, c ):
+		chunk = self.chunks.get( c )
+		if chunk != None:
+			return chunk
+
+		chunk = self.chunks[ c ] = self.generator.Chunk( c )
+
+		for x1, y1, x2, y2, t in chunk.lines:
+			self.ground_counts[ t ] += 1
+
+			pygame.draw.line( self.terrain_minimap, self.colour[t],
+				(x1 * self.minimap_scale_w, y1 * self.minimap_scale_h),
+				(x2 * self.minimap_scale_w, y2 * self.minimap_scale_h)
+			)
+
+		return chunk
+
+
+	# Stream
+	# Generate the chunks within a distance of an area of the world, so they
+	# are ready before anything reaches them
+	#
+	# @param object self
+	# @param int x1
+	# @param int x2
+	# @return None
+
+	def Stream( self, x1, x2 ):
+		x1 = max( x1 - Config.terrain_stream_distance, 0 )
+		x2 = min( x2 + Config.terrain_stream_distance, self.width )
+		for c in range( int( x1 ) // self.chunk_width, (int( x2 ) // self.chunk_width) + 1 ):
+			self.Chunk( c )
+
+
+	# Segments
+	# Walk the segments of the world from one end, generating chunks as they
+	# are reached. The last chunk runs past the end of the world, segments
+	# whose middle is past it are left out
+	#
+	# @param object self
+	# @param (optional) bool reverse
+	# @return generator
+
+	def Segments( self, reverse=False ):
+		chunks = range( (self.width // self.chunk_width) + 1 )
+		if reverse:
+			chunks.reverse( )
+
+		for c in chunks:
+			types = self.Chunk( c ).types
+			if reverse:
+				types = reversed( types )
+
+			for segment in types:
+				if segment[2] < self.width:
+					yield segment
+
+
 	# Nav Map
-	def NavMap( self ):
-		navmap = pygame.Surface( (Config.world.terrain_minimap.get_width(), Config.world.terrain_minimap.get_height()) )
-		navmap.convert_alpha( )
-		navmap.set_colorkey((0,0,0))
+	# Get the layer of sprite marks drawn over the minimap, it is redrawn at
+	# most Config.navmap_rate times a second
+	#
+	# @param object self
+	# @param int ticks
+	# @return Surface
+
+	def NavMap( self, ticks ):
+		if self.navmap_refreshed != None and ticks - self.navmap_refreshed < 1000 / Config.navmap_rate:
+			return self.navmap
+		self.navmap_refreshed = ticks
+
+		navmap = self.navmap
+		navmap.fill( (0,0,0) )
 
 		navmap_scale_w = float(self.terrain_minimap.get_width( )) / float(Config.screen_w * Config.world_size)
 		navmap_scale_h = float(self.terrain_minimap.get_height( )) / float(Config.screen_h)
 
-		pygame.draw.lines( navmap, (100,100,100), True, (
-			(navmap_scale_w * -Config.world_offset, 0),
-			((navmap_scale_w * (Config.screen_w - Config.world_offset))-1, 0),
-			((navmap_scale_w * (Config.screen_w - Config.world_offset))-1, (navmap_scale_h * Config.screen_h)-1),
-			(navmap_scale_w * -Config.world_offset, (navmap_scale_h * Config.screen_h)-1)
-		) )
-
 		# Add sprites
 		for s in Config.app.sprites_all:
-			x = s.vector[0] * navmap_scale_w
-			y = s.vector[1] * navmap_scale_h
-			width = 2
-			height = 2
-
-			if s.__class__.__name__ == "Player":
-				colour = Config.colour_player
-			elif s.__class__.__name__ == "FriendlyPlant":
-				colour = Config.colour_friendly
-				if s.level > 1:
-					height = 4
-			elif s.__class__.__name__ == "FriendlyTree":
-				colour = Config.colour_friendly
-				height = 8
-				y += 4
-				if s.level == 2:
-					height = 16
-					y -= 8
-			elif s.__class__.__name__ == "EnergyParticle":
-				colour = (255,255,255)
-				height = 1
-				width = 1
-				y -= 1
-			elif s.__class__.__name__ == "EnemyFlying":
-				colour = Config.colour_enemy
-				width = s.level + 1
-				height = s.level + 1
-			elif s.__class__.__name__ == "EnemyTree":
-				colour = Config.colour_enemy
-				height = 8
-				y += 2
-			else:
+			style = navmap_styles.get( s.__class__ )
+			if style == None:
 				continue
 
+			colour, x, y, width, height = style( s, s.vector[0] * navmap_scale_w, s.vector[1] * navmap_scale_h )
+
 			if width < 2: width = 2
 			if height < 2: height = 2
 
@@ -169,37 +217,332 @@ class World( ):
 				height
 			) )
 
-
 		return navmap
 
 
+	# Draw Nav Map Viewport
+	# Draw the frame showing the visible part of the world, this follows the
+	# camera every frame
+	#
+	# @param object self
+	# @param Surface surface
+	# @param tuple pos
+	# @return None
+
+	def DrawNavMapViewport( self, surface, pos ):
+		navmap_scale_w = float(self.terrain_minimap.get_width( )) / float(Config.screen_w * Config.world_size)
+		navmap_scale_h = float(self.terrain_minimap.get_height( )) / float(Config.screen_h)
+
+		x, y = pos
+		pygame.draw.lines( surface, (100,100,100), True, (
+			(x + (navmap_scale_w * -Config.world_offset), y),
+			(x + (navmap_scale_w * (Config.screen_w - Config.world_offset))-1, y),
+			(x + (navmap_scale_w * (Config.screen_w - Config.world_offset))-1, y + (navmap_scale_h * Config.screen_h)-1),
+			(x + (navmap_scale_w * -Config.world_offset), y + (navmap_scale_h * Config.screen_h)-1)
+		) )
+
+
+	# Draw Terrain
+	# Draw the terrain at the camera offset, or only the part of it inside an
+	# area of the screen
+	#
+	# @param object self
+	# @param Surface surface
+	# @param (optional) Rect area
+	# @return None
+
+	def DrawTerrain( self, surface, area=None ):
+		if area == None:
+			area = surface.get_rect( )
+
+		offset = int( Config.world_offset )
+		tile_w = Config.terrain_tile_width
+
+		# Only blit the tiles overlapping the area
+		first = max( (area.left - offset) // tile_w, 0 )
+		last = min( (area.right - 1 - offset) // tile_w, self.width // tile_w )
+		for i in range( first, last + 1 ):
+			tile_rect = pygame.Rect( (i * tile_w) + offset, 0, tile_w, Config.screen_h )
+			clip = tile_rect.clip( area )
+			surface.blit( self.TerrainTile( i ), clip, clip.move( -tile_rect.x, 0 ) )
+
+
+	# Get Terrain Tile
+	# Get a tile of the terrain, drawing it if it is not cached. The least
+	# recently used tiles are dropped once the cache is full
+	#
+	# @param object self
+	# @param int i
+	# @return Surface
+
+	def TerrainTile( self, i ):
+		tile = self.tiles.pop( i, None )
+
+		if tile == None:
+			tile_w = Config.terrain_tile_width
+			x = i * tile_w
+
+			terrain_lines = [ ]
+			for c in range( x // self.chunk_width, ((x + tile_w) // self.chunk_width) + 1 ):
+				for line in self.Chunk( c ).lines:
+					if line[2] >= x and line[0] <= x + tile_w:
+						terrain_lines.append( line )
+
+			# Draw whole segments and copy the tile out, so lines crossing the
+			# tile edges come out the same as if drawn unclipped
+			x1 = terrain_lines[0][0]
+			x2 = terrain_lines[-1][2]
+			lines = pygame.Surface( (x2 - x1 + 1, Config.screen_h) )
+			for line in terrain_lines:
+				self.DrawTerrainLine( lines, line, x1 )
+
+			tile = pygame.Surface( (tile_w, Config.screen_h) )
+			tile.blit( lines, (x1 - x, 0) )
+
+			# Always keep enough tiles to cover the screen
+			cache_size = max( Config.terrain_tile_cache, (Config.screen_w / tile_w) + 2 )
+			while len( self.tiles ) >= cache_size:
+				self.tiles.popitem( last=False )
+
+		self.tiles[ i ] = tile
+		return tile
+
+
+	# Draw Terrain Line
+	# Draw one terrain segment, shifted left by an offset
+	#
+	# @param object self
+	# @param Surface surface
+	# @param tuple line
+	# @param int offset
+	# @return None
+
+	def DrawTerrainLine( self, surface, line, offset ):
+		x1, y1, x2, y2, t = line
+		x1 -= offset
+		x2 -= offset
+
+		if t == 'water':
+			pygame.draw.line( surface, self.colour['water'], (x1, y1), (x2, y2) )
+			pygame.draw.line( surface, self.colour['water'], (x1, y1+1), (x2, y2+1) )
+			pygame.draw.line( surface, self.colour['water'], (x1, y1+2), (x2, y2+2) )
+		else:
+			pygame.draw.line( surface, self.colour['dirt'], (x1, y1), (x2, y2) )
+
+
 	# Get Ground Height and Angle
 	def GroundInfo( self, xlook ):
 		xlook = int( xlook )
-		return self.terrain_height[xlook], self.terrain_angle[xlook]
+		chunk = self.chunks.get( xlook // self.chunk_width )
+		if chunk == None:
+			chunk = self.Chunk( xlook // self.chunk_width )
+
+		i = xlook - chunk.x1
+		return chunk.height[i], chunk.angle[i]
+
+
+	# Get Ground Heights and Angles
+	# Look up the ground at many x positions in one call, positions outside
+	# the world are clamped to its edges
+	#
+	# @param object self
+	# @param list xlooks
+	# @return list heights, list angles
+
+	def GroundInfoBatch( self, xlooks ):
+		width = self.width
+		chunk_width = self.chunk_width
+
+		# Group the positions by chunk, so each chunk is found once
+		groups = { }
+		for i, x in enumerate( xlooks ):
+			x = min( max( int(x), 0 ), width )
+			groups.setdefault( x // chunk_width, [ ] ).append( (i, x) )
+
+		heights = [ 0.0 ] * len( xlooks )
+		angles = [ 0.0 ] * len( xlooks )
+		for c, looks in groups.items( ):
+			chunk = self.chunks.get( c )
+			if chunk == None:
+				chunk = self.Chunk( c )
+
+			height = chunk.height
+			angle = chunk.angle
+			x1 = chunk.x1
+			for i, x in looks:
+				heights[i] = height[x - x1]
+				angles[i] = angle[x - x1]
+
+		return heights, angles
+
+
+	# Resolve Ground
+	# Look up the ground below every sprite in a group for this tick, the
+	# sprites pick it up with GetGround during their update
+	#
+	# @param object self
+	# @param object sprites
+	# @return None
+
+	def ResolveGround( self, sprites ):
+		sprites = sprites.sprites( )
+		heights, angles = self.GroundInfoBatch( [ s.GroundX( ) for s in sprites ] )
+		for i in range( len( sprites ) ):
+			sprites[i].ground = heights[i], angles[i]
+
+
+	# Get Segment
+	# The chunk and index of the terrain segment under a pixel, or None and -1
+	# outside the world
+	def Segment( self, xlook ):
+		xlook = int( xlook )
+		if xlook < 0 or xlook > self.width:
+			return None, -1
+
+		chunk = self.Chunk( xlook // self.chunk_width )
+		return chunk, chunk.segment[ xlook - chunk.x1 ]
 
 
 	# Get Ground Type
 	def GroundType( self, xlook ):
-		xlook = int( xlook )
-		for x1, x2, xc, ym, t in self.terrain_type:
-			if x1 <= xlook and x2 >= xlook:
-				return xc, ym, t
-		return 0, 0, ''
-		#return self.terrain_type[xlook]
+		chunk, i = self.Segment( xlook )
+		if i < 0:
+			return 0, 0, ''
+		x1, x2, xc, ym, t = chunk.types[i]
+		return xc, ym, t
+
+
+	# Spore Stack
+	# The list of spores of a class stacked on the water hole under a pixel,
+	# bottom first. Spores add themselves as they land and remove themselves
+	# when they die
+	#
+	# @param object self
+	# @param class cls
+	# @param int xlook
+	# @return list
+
+	def SporeStack( self, cls, xlook ):
+		chunk, i = self.Segment( xlook )
+		key = (cls, chunk.index, i)
+
+		stack = self.stacks.get( key )
+		if stack == None:
+			stack = self.stacks[ key ] = [ ]
+		return stack
 
 
 	# Set Ground Type
 	def SetGroundType( self, xlook, new_type ):
-		xlook = int( xlook )
-		i = 0
-		for x1, x2, xc, ym, t in self.terrain_type:
-			if x1 <= xlook and x2 >= xlook:
-				self.terrain_type[i] = x1, x2, xc, ym, new_type
-				#pygame.draw.line( self.terrain, self.colour[t], (x1, y1), (x2, y2) )
-				#pygame.draw.line( self.terrain, self.colour[t], (x1, y1+1), (x2, y2+1) )
-				#pygame.draw.line( self.terrain, self.colour[t], (x1, y1+2), (x2, y2+2) )
-			i += 1	
+		chunk, i = self.Segment( xlook )
+		if i < 0:
+			return
+
+		x1, x2, xc, ym, t = chunk.types[i]
+		chunk.types[i] = x1, x2, xc, ym, new_type
+		self.ground_counts[ t ] -= 1
+		self.ground_counts[ new_type ] += 1
+		self.ground_changes += 1
+		#pygame.draw.line( self.terrain, self.colour[t], (x1, y1), (x2, y2) )
+		#pygame.draw.line( self.terrain, self.colour[t], (x1, y1+1), (x2, y2+1) )
+		#pygame.draw.line( self.terrain, self.colour[t], (x1, y1+2), (x2, y2+2) )
+
+
+# -------- Nav Map Styles --------
+# How each kind of sprite is marked on the nav map. Each is given the sprite
+# and its scaled position, and returns the colour, position and size
+
+def NavMapPlayer( s, x, y ):
+	return Config.colour_player, x, y, 2, 2
+
+def NavMapFriendlyPlant( s, x, y ):
+	height = 2
+	if s.level > 1:
+		height = 4
+	return Config.colour_friendly, x, y, 2, height
+
+def NavMapFriendlyTree( s, x, y ):
+	if s.level == 2:
+		return Config.colour_friendly, x, y - 4, 2, 16
+	return Config.colour_friendly, x, y + 4, 2, 8
+
+def NavMapEnergyParticle( s, x, y ):
+	return (255,255,255), x, y - 1, 1, 1
+
+def NavMapEnemyFlying( s, x, y ):
+	return Config.colour_enemy, x, y, s.level + 1, s.level + 1
+
+def NavMapEnemyTree( s, x, y ):
+	return Config.colour_enemy, x, y + 2, 2, 8
+
+navmap_styles = {
+	Player: NavMapPlayer,
+	FriendlyPlant: NavMapFriendlyPlant,
+	FriendlyTree: NavMapFriendlyTree,
+	EnergyParticle: NavMapEnergyParticle,
+	EnemyFlying: NavMapEnemyFlying,
+	EnemyTree: NavMapEnemyTree
+}
+
+
+# -------- World Preparation --------
+# Prepares the next world on a worker thread while the menu is showing. Every
+# chunk of terrain is generated and drawn onto the minimap, so starting the
+# game only has to add the sprites. The thread only draws on surfaces of its
+# own world. Sprite sheets are converted to the display's format, which SDL
+# does not allow away from the main thread, so they are decoded by
+# App.PrepareGame instead
+class WorldPreparation( ):
+
+	# Init
+	# @param object self
+	# @param int width
+	# @param int seed
+	# @return object self
+
+	def __init__( self, width, seed ):
+		self.width = width
+		self.seed = seed
+		self.world = World( )
+		self.progress = 0.0
+		self.done = False
+
+		self.thread = threading.Thread( target=self.Run )
+		self.thread.daemon = True
+		self.thread.start( )
+
+
+	# Run
+	# @param object self
+	# @return None
+
+	def Run( self ):
+		try:
+			world = self.world
+			world.Prepare( self.width, self.seed )
+
+			count = (self.width // world.chunk_width) + 1
+			for c in range( count ):
+				world.Chunk( c )
+				self.progress = float( c + 1 ) / count
+		except Exception:
+			traceback.print_exc( )
+			self.world = None
+		finally:
+			self.done = True
+
+
+	# Take
+	# Wait for the world to be ready and hand it over, None if preparing it
+	# failed
+	#
+	# @param object self
+	# @return World
+
+	def Take( self ):
+		self.thread.join( )
+		return self.world
+
 
 
 # -------- ResourcePoint --------
@@ -213,13 +556,14 @@ class ResourcePoint( StaticSprite ):
 
 # -------- World Keyboard Listener --------
 class WorldKeyboardListener( EventListener ):
+	events = [PygameEvent]
+	pygame_types = [pygame.KEYDOWN]
+
 	# Notify
 	def Notify( self, event ):
-		if event.name == "Pygame Event":
-			if event.data.type == pygame.KEYDOWN:
-				if event.data.key == pygame.K_t:
-					Config.world.GenerateTerrain( Config.screen_w * Config.world_size )
-				elif event.data.key == pygame.K_e:
-					EnemyFlying( [400, Config.screen_h - 50] )
-				elif event.data.key == pygame.K_f:
-					FriendlyPlant( )
\ No newline at end of file
+		if event.data.key == pygame.K_t:
+			Config.world.GenerateTerrain( Config.screen_w * Config.world_size )
+		elif event.data.key == pygame.K_e:
+			EnemyFlying.New( [400, Config.screen_h - 50] )
+		elif event.data.key == pygame.K_f:
+			FriendlyPlant( )
\ No newline at end of file
@@ -8,49 +8,168 @@
 # -------- Init --------
 
 # Load config
+import os, sys, argparse
 import app.Config
+from app import Trace
 
 # Definitions
 
-# Initialise pygame
-import pygame, pygame._view
-pygame.init( )
+# Command line
+parser = argparse.ArgumentParser( description=app.Config.app_title )
+parser.add_argument( "--headless", action="store_true", help="run the simulation with no window or audio, then exit" )
+parser.add_argument( "--seed", type=int, help="seed for the terrain and everything spawned in it" )
+parser.add_argument( "--world-size", type=int, help="width of the world in screens" )
+parser.add_argument( "--ticks", type=int, help="ticks to run when headless, 3600 or the benchmark's own count by default" )
+parser.add_argument( "--delta", type=float, default=1000.0 / app.Config.sim_rate, help="milliseconds per tick when headless" )
+parser.add_argument( "--preset", action="append", default=[], help="entities to add when headless: spores, flyers or firing" )
+parser.add_argument( "--render", action="store_true", help="still draw every tick when headless" )
+parser.add_argument( "--spore-engine", action="store_true", help="move all spores at once with NumPy" )
+parser.add_argument( "--benchmark", action="append", default=[], help="run a benchmark scenario headlessly, or all of them" )
+parser.add_argument( "--output", default="benchmark.json", help="file benchmark results are written to" )
+parser.add_argument( "--profile", nargs="?", const=app.Config.profile_file, help="time every frame and write them to a file on exit, .json for JSON" )
+parser.add_argument( "--trace", action="store_true", help="print how long each part of starting up takes" )
+parser.add_argument( "--record", metavar="FILE", help="record the first game played to a replay file" )
+parser.add_argument( "--replay", metavar="FILE", help="play a recorded game back, in real time or as fast as possible when headless" )
+args = parser.parse_args( )
+
+if args.trace:
+	app.Config.trace = True
+
+if args.profile != None:
+	app.Config.profile = True
+	app.Config.profile_file = args.profile
+
+if args.benchmark:
+	args.headless = True
+	args.render = True
+
+if args.seed != None:
+	app.Config.seed = args.seed
+if args.world_size != None:
+	app.Config.world_size = args.world_size
+if args.spore_engine:
+	app.Config.spore_engine = True
+
+if args.headless:
+	os.environ['SDL_VIDEODRIVER'] = 'dummy'
+	app.Config.audio = False
+	app.Config.render = args.render
+
+# Import pygame and app logic. Fonts and the mixer are initialised when first
+# used, not here
+Trace.Begin( "import" )
+import pygame
+if getattr( sys, "frozen", False ):
+	import pygame._view # Needed by frozen builds to find pygame's image loading
 
-# Import app logic
 from app.App import App
 from app.Event import PygameEvent
+from app import Asset
+Trace.End( "import" )
+
+# Initialise pygame
+Trace.Begin( "init" )
+pygame.display.init( )
 
 # Create app
 app.Config.app = App( )
 
 # Setup the screen
-app.Config.screen = pygame.display.set_mode( [app.Config.screen_w, app.Config.screen_h] )
-pygame.display.set_caption( app.Config.app_title )
-pygame.display.set_icon( pygame.image.load( "icon.png" ).convert_alpha( ) )
-app.Config.screen.convert( )
+if args.headless:
+	app.Config.screen = pygame.display.set_mode( [app.Config.screen_w, app.Config.screen_h], 0, 32 )
+	Asset.cache.Invalidate( )
+else:
+	app.Config.screen = pygame.display.set_mode( [app.Config.screen_w, app.Config.screen_h] )
+	Asset.cache.Invalidate( )
+	pygame.display.set_caption( app.Config.app_title )
+	pygame.display.set_icon( pygame.image.load( "icon.png" ).convert_alpha( ) )
+	app.Config.screen.convert( )
+Trace.End( "init" )
+Trace.Begin( "first frame" )
+
+
+# -------- Headless --------
+if args.benchmark:
+	import json
+	from app import Benchmark
+
+	names = args.benchmark
+	if "all" in names:
+		names = sorted( Benchmark.scenarios.keys( ) )
+
+	for name in names:
+		if name not in Benchmark.scenarios:
+			parser.error( "unknown benchmark " + name )
+
+	results = { }
+	for name in names:
+		r = results[ name ] = Benchmark.Run( name, args.delta, args.ticks, args.seed or 0 )
+		split = r['split_ms']
+		draw = split['terrain'] + split['navmap'] + split['draw'] + split['hud'] + split['flip']
+		print "%s: %.1f ticks per second, p50 %.2fms p95 %.2fms p99 %.2fms (update %.2fms, collision %.2fms, draw %.2fms)" % (name, r['ticks_per_second'], r['frame_ms']['p50'], r['frame_ms']['p95'], r['frame_ms']['p99'], split['stream'] + split['spores'] + split['update'], split['collision'], draw)
+
+	out = open( args.output, "w" )
+	json.dump( results, out, indent=2, sort_keys=True )
+	out.close( )
+	print "Results written to " + args.output
+
+elif args.replay:
+	from app import Replay
+
+	ticks, seconds = Replay.Run( Replay.Load( args.replay ), not args.headless )
+	print "%d ticks replayed in %.2f seconds, %.1f ticks per second (seed %d)" % (ticks, seconds, ticks / max(seconds, 0.001), app.Config.app.seed)
+	app.Config.app.running = False
+
+elif args.headless:
+	from app import Headless
+
+	for name in args.preset:
+		if name not in Headless.presets:
+			parser.error( "unknown preset " + name )
+
+	ticks, seconds = Headless.Run( args.ticks or 3600, args.delta, args.preset )
+	print "%d ticks in %.2f seconds, %.1f ticks per second (seed %d)" % (ticks, seconds, ticks / max(seconds, 0.001), app.Config.app.seed)
+
+if args.headless:
+	app.Config.app.running = False
 
 # Create the clock
 clock = pygame.time.Clock( )
 
+# Record the first game
+recorder = None
+if args.record != None:
+	from app.Replay import Recorder
+	recorder = Recorder( )
+
 
 # -------- Main Program Loop --------
 while app.Config.app.running:
 
 	# Capture events
+	posted = [ ]
 	for pe in pygame.event.get( ):
 		if app.Config.app.mode == "Menu":
 			if pe.type == pygame.MOUSEBUTTONDOWN:
-				app.Config.app.LoadGame( )
+				app.Config.app.StartGame( )
 			elif pe.type == pygame.QUIT:
 				app.Config.app.running = False
 		else:
 			event = PygameEvent( pe )
 			app.Config.app.em.Post( event )
+			posted.append( pe )
 
 	# Process tick
 	clock.tick( app.Config.fps )
+	if recorder != None:
+		recorder.Tick( clock.get_time(), posted )
 	app.Config.app.Tick( clock.get_time() )
+	Trace.End( "first frame" )
 
 
 # -------- Exit --------
+if app.Config.profile:
+	app.Config.app.profiler.Dump( app.Config.profile_file )
+if recorder != None:
+	recorder.Save( args.record )
 pygame.quit( )
\ No newline at end of file
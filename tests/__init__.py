@@ -0,0 +1,35 @@
+# -------- tests --------
+# Run from the repository root with
+#   python -m unittest discover -s tests -t .
+# ---------------------------
+
+# Imports
+import os
+import pygame
+import app.Config as Config
+
+# Definitions
+root = os.path.dirname( os.path.dirname( os.path.abspath( __file__ ) ) )
+
+
+# Start
+# Start pygame with no window or audio and create the app, the way a headless
+# run of main.py does. Only done once, later calls return the same app
+#
+# @return object app
+
+def Start( ):
+	if Config.app != None:
+		return Config.app
+
+	os.chdir( root )
+	os.environ['SDL_VIDEODRIVER'] = 'dummy'
+	Config.audio = False
+	Config.render = False
+
+	pygame.display.init( )
+
+	from app.App import App
+	Config.app = App( )
+	Config.screen = pygame.display.set_mode( [Config.screen_w, Config.screen_h], 0, 32 )
+	return Config.app
\ No newline at end of file
@@ -0,0 +1,52 @@
+# -------- test_asset.py --------
+# The asset cache counts a hit or a miss for every image and frame list asked
+# for
+# ---------------------------
+
+# Imports
+import unittest
+from tests import Start
+from app.Asset import AssetCache
+
+
+# -------- Asset Cache Test --------
+class AssetCacheTest( unittest.TestCase ):
+
+	def setUp( self ):
+		Start( )
+		self.cache = AssetCache( )
+
+	def assertCounts( self, hits, misses ):
+		stats = self.cache.Stats( )
+		self.assertEqual( (stats['hits'], stats['misses']), (hits, misses) )
+
+	# A sprite asks for its sheet and then its frames, each counted once.
+	# Splitting the frames is not counted as asking for the image again
+	def testSheet( self ):
+		image = self.cache.Image( "enemies/tree-1.png" )
+		frames = self.cache.Frames( "enemies/tree-1.png", 6 )
+		self.assertEqual( len( frames ), 6 )
+		self.assertCounts( 0, 2 )
+
+		self.assertTrue( self.cache.Image( "enemies/tree-1.png" ) is image )
+		self.assertTrue( self.cache.Frames( "enemies/tree-1.png", 6 ) is frames )
+		self.assertCounts( 2, 2 )
+
+	# Frames split first are still a miss
+	def testFrames( self ):
+		self.cache.Frames( "enemies/tree-1.png", 6 )
+		self.assertCounts( 0, 1 )
+
+		self.cache.Frames( "enemies/tree-1.png", 6 )
+		self.assertCounts( 1, 1 )
+
+	def testImage( self ):
+		image = self.cache.Image( "enemies/spore.png" )
+		self.assertCounts( 0, 1 )
+
+		self.assertTrue( self.cache.Image( "enemies/spore.png" ) is image )
+		self.assertCounts( 1, 1 )
+
+
+if __name__ == '__main__':
+	unittest.main( )
\ No newline at end of file
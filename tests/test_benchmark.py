@@ -0,0 +1,59 @@
+# -------- test_benchmark.py --------
+# Percentiles and the results of a benchmark run
+# ---------------------------
+
+# Imports
+import json, unittest
+from tests import Start
+from app import Benchmark
+from app.Profiler import phases
+
+
+# -------- Percentile Test --------
+class PercentileTest( unittest.TestCase ):
+
+	# Nearest rank, never one rank too high on whole ranks
+	def testNearestRank( self ):
+		values = range( 1, 101 )
+		self.assertEqual( Benchmark.Percentile( values, 50 ), 50 )
+		self.assertEqual( Benchmark.Percentile( values, 95 ), 95 )
+		self.assertEqual( Benchmark.Percentile( values, 99 ), 99 )
+		self.assertEqual( Benchmark.Percentile( values, 100 ), 100 )
+
+	# Ranks that are not whole round up
+	def testRoundsUp( self ):
+		self.assertEqual( Benchmark.Percentile( [1, 2, 3], 50 ), 2 )
+		self.assertEqual( Benchmark.Percentile( [1, 2, 3], 99 ), 3 )
+
+	# Ends and an empty list
+	def testEdges( self ):
+		self.assertEqual( Benchmark.Percentile( [4, 5], 0 ), 4 )
+		self.assertEqual( Benchmark.Percentile( [7], 50 ), 7 )
+		self.assertEqual( Benchmark.Percentile( [], 50 ), 0.0 )
+
+
+
+# -------- Run Test --------
+class RunTest( unittest.TestCase ):
+
+	# A short scenario run gives every field main.py writes out as JSON
+	def testResultShape( self ):
+		Start( )
+		result = json.loads( json.dumps( Benchmark.Run( 'firing', ticks=20 ) ) )
+
+		self.assertEqual( result['ticks'], 20 )
+		self.assertEqual( result['presets'], ['firing'] )
+		self.assertTrue( result['ticks_per_second'] > 0 )
+		self.assertTrue( result['sprites_start'] > 0 )
+
+		frame_ms = result['frame_ms']
+		self.assertEqual( sorted( frame_ms.keys( ) ), ['max', 'mean', 'p50', 'p95', 'p99'] )
+		self.assertTrue( frame_ms['p50'] <= frame_ms['p95'] <= frame_ms['p99'] <= frame_ms['max'] )
+
+		self.assertEqual( sorted( result['split_ms'].keys( ) ), sorted( phases ) )
+		self.assertTrue( 'Player' in result['classes_ms'] )
+		self.assertTrue( 'EnergyParticle' in result['pools'] )
+
+
+if __name__ == '__main__':
+	unittest.main( )
\ No newline at end of file
@@ -0,0 +1,47 @@
+# -------- test_profiler.py --------
+# Collision checks are wrapped once, however many profilers are on
+# ---------------------------
+
+# Imports
+import unittest
+from tests import Start
+import app.Config as Config
+from app import Profiler
+from app.Sprite import Sprite
+
+
+# -------- Collision Timing Test --------
+class CollisionTimingTest( unittest.TestCase ):
+
+	def setUp( self ):
+		Start( ).LoadGame( )
+		self.first = Profiler.Profiler( )
+		self.second = Profiler.Profiler( )
+
+	def tearDown( self ):
+		self.first.Disable( )
+		self.second.Disable( )
+
+	# Like --profile with --benchmark, the benchmark's profiler gets the time
+	def testTimedOnce( self ):
+		self.first.Enable( )
+		self.second.Enable( )
+
+		Config.player.CheckCollisions( )
+		self.assertFalse( 'collision' in self.first.frame )
+		self.assertTrue( 'collision' in self.second.frame )
+
+	# Disabled first in first out, the original method is put back
+	def testRestored( self ):
+		original = Sprite.__dict__['CheckCollisions']
+		self.first.Enable( )
+		self.second.Enable( )
+
+		self.first.Disable( )
+		self.assertFalse( Sprite.__dict__['CheckCollisions'] is original )
+		self.second.Disable( )
+		self.assertTrue( Sprite.__dict__['CheckCollisions'] is original )
+
+
+if __name__ == '__main__':
+	unittest.main( )
\ No newline at end of file
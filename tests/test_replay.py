@@ -0,0 +1,91 @@
+# -------- test_replay.py --------
+# A replay runs the recorded game again exactly
+# ---------------------------
+
+# Imports
+import os, tempfile, unittest
+import pygame
+from tests import Start
+import app.Config as Config
+from app import Replay
+from app.Event import PygameEvent
+
+
+# State
+# Every sprite's class and position, in a fixed order
+def State( app ):
+	return sorted( (s.__class__.__name__, round( s.vector[0], 3 ), round( s.vector[1], 3 )) for s in app.sprites_all )
+
+
+
+# -------- Replay Test --------
+class ReplayTest( unittest.TestCase ):
+
+	def setUp( self ):
+		self.app = Start( )
+		self.saved = Config.screen_w, Config.screen_h, Config.screen_move_x, Config.seed
+		handle, self.filename = tempfile.mkstemp( ".json" )
+		os.close( handle )
+
+	def tearDown( self ):
+		Config.screen_w, Config.screen_h, Config.screen_move_x, Config.seed = self.saved
+		Config.screen = pygame.display.set_mode( [Config.screen_w, Config.screen_h], 0, 32 )
+		os.remove( self.filename )
+
+	# Played back with other preferences, the recorded screen size is used
+	def testOtherScreenSize( self ):
+		app = self.app
+		Config.seed = 3
+		app.LoadGame( )
+
+		recorder = Replay.Recorder( )
+		keys = [pygame.K_d, pygame.K_w, pygame.K_a, pygame.K_s]
+		for i in range( 240 ):
+			events = [ ]
+			if i % 30 == 0:
+				events.append( pygame.event.Event( pygame.KEYDOWN, key=keys[ (i / 30) % 4 ], mod=0 ) )
+			if i % 60 == 10:
+				events.append( pygame.event.Event( pygame.MOUSEBUTTONDOWN, button=1, pos=(0, 0) ) )
+			for pe in events:
+				app.em.Post( PygameEvent( pe ) )
+
+			frame_time = (16, 17, 33)[ i % 3 ]
+			recorder.Tick( frame_time, events )
+			app.Tick( frame_time )
+
+		recorder.Save( self.filename )
+		recorded = State( app )
+		recorded_size = Config.screen_w, Config.screen_h
+
+		# Different preferences on the machine playing it back
+		Config.screen_w, Config.screen_h = 800, 600
+		Config.screen_move_x = 320
+		Config.screen = pygame.display.set_mode( [800, 600], 0, 32 )
+
+		ticks, seconds = Replay.Run( Replay.Load( self.filename ) )
+		self.assertEqual( ticks, len( recorder.ticks ) )
+		self.assertEqual( (Config.screen_w, Config.screen_h), recorded_size )
+		self.assertEqual( State( app ), recorded )
+
+	# Closing the window stops a replay played in real time
+	def testQuit( self ):
+		app = self.app
+		Config.seed = 3
+		app.LoadGame( )
+
+		recorder = Replay.Recorder( )
+		for i in range( 30 ):
+			recorder.Tick( 16, [ ] )
+		recorder.Save( self.filename )
+
+		pygame.event.clear( )
+		pygame.event.post( pygame.event.Event( pygame.QUIT ) )
+		try:
+			ticks, seconds = Replay.Run( Replay.Load( self.filename ), True )
+		finally:
+			app.running = True
+		self.assertEqual( ticks, 1 )
+
+
+if __name__ == '__main__':
+	unittest.main( )
\ No newline at end of file
@@ -0,0 +1,85 @@
+# -------- test_spores.py --------
+# Spores fall the same way whatever the simulation rate, moved one at a time
+# or all together by the spore engine
+# ---------------------------
+
+# Imports
+import random, unittest
+from tests import Start
+import app.Config as Config
+from app.Friendly import FriendlySpore
+from app.Enemy import EnemySpore
+from app import Spores
+
+
+# Fall
+# Drop a spore into a new game and step it until it lands
+#
+# @param class cls
+# @param int rate Steps per second
+# @param (optional) bool engine Move the spore with the spore engine
+# @return float milliseconds taken, float x landed at
+
+def Fall( cls, rate, engine=False ):
+	Config.sim_rate = rate
+	Config.seed = 1
+	Config.spore_engine = engine
+
+	app = Start( )
+	app.LoadGame( )
+
+	random.seed( 5 )
+	spore = cls.New( [1000.0, 50.0] )
+
+	step = 1000.0 / rate
+	elapsed = 0.0
+	while not spore.looking:
+		if engine:
+			app.spores.Step( step )
+		else:
+			spore.Update( step, elapsed )
+		elapsed += step
+
+	return elapsed, spore.vector[0]
+
+
+
+# -------- Fall Test --------
+class FallTest( unittest.TestCase ):
+
+	# Put back the rate and seed
+	def setUp( self ):
+		self.saved = Config.sim_rate, Config.seed, Config.spore_engine
+		Config.spore_engine = False
+
+	def tearDown( self ):
+		Config.sim_rate, Config.seed, Config.spore_engine = self.saved
+
+	# Landing is only noticed on the step after it happens, so times can be
+	# a step apart at each rate
+	def assertSameFall( self, cls ):
+		time_60, x_60 = Fall( cls, 60 )
+		for rate in (30, 144):
+			time, x = Fall( cls, rate )
+			self.assertTrue( abs( time - time_60 ) <= (1000.0 / rate) + (1000.0 / 60) + 0.001, (rate, time, time_60) )
+			self.assertAlmostEqual( x, x_60, delta=3.0, msg=(rate, x, x_60) )
+
+	def testFriendly( self ):
+		self.assertSameFall( FriendlySpore )
+
+	def testEnemy( self ):
+		self.assertSameFall( EnemySpore )
+
+	# The engine moves spores exactly as their own updates do, at any rate
+	@unittest.skipIf( Spores.numpy == None, "NumPy is not installed" )
+	def testEngine( self ):
+		for cls in (FriendlySpore, EnemySpore):
+			for rate in (30, 144):
+				time, x = Fall( cls, rate )
+				engine_time, engine_x = Fall( cls, rate, True )
+				self.assertAlmostEqual( engine_time, time, places=6, msg=(cls, rate) )
+				self.assertAlmostEqual( engine_x, x, places=6, msg=(cls, rate) )
+
+
+if __name__ == '__main__':
+	unittest.main( )
\ No newline at end of file
@@ -0,0 +1,88 @@
+# -------- test_stacks.py --------
+# Only live spores are stacked on water holes
+# ---------------------------
+
+# Imports
+import unittest
+from tests import Start
+import app.Config as Config
+from app.Friendly import FriendlySpore
+from app.Enemy import EnemySpore
+
+
+# Water Hole
+# The middle and height of the first water hole still free in the world
+def WaterHole( ):
+	for x1, x2, xc, ym, t in Config.world.Segments( ):
+		if t == "water":
+			return xc, ym
+
+
+# Stacked
+# Every spore in every stack
+def Stacked( ):
+	return [ s for stack in Config.world.stacks.values( ) for s in stack ]
+
+
+
+# -------- Stack Test --------
+class StackTest( unittest.TestCase ):
+
+	def setUp( self ):
+		self.app = Start( )
+		self.saved = Config.seed
+		Config.seed = 2
+		self.app.LoadGame( )
+
+	def tearDown( self ):
+		Config.seed = self.saved
+
+	# Land a spore on the ground over the water hole
+	def Land( self, cls, xc, ym ):
+		spore = cls.New( [float( xc ), float( ym - 6 )] )
+		spore.looking = True
+		return spore
+
+	# An enemy spore updated first kills the friendly spore it lands on, which
+	# then must not stack itself on the water
+	def testKilledMidStep( self ):
+		xc, ym = WaterHole( )
+		friendly = self.Land( FriendlySpore, xc, ym )
+		enemy = self.Land( EnemySpore, xc, ym )
+
+		self.app.UpdateGame( 1000.0 / Config.sim_rate )
+
+		self.assertFalse( friendly.alive( ) )
+		self.assertFalse( enemy.alive( ) )
+		self.assertEqual( friendly.stack, None )
+		self.assertEqual( Stacked( ), [ ] )
+
+	# A reused spore starts outside every stack, so the stack it died in
+	# cannot kill it again
+	def testReused( self ):
+		xc, ym = WaterHole( )
+		spore = self.Land( FriendlySpore, xc, ym )
+		spore.CheckOnWater( )
+		stack = spore.stack
+		self.assertEqual( stack, [ spore ] )
+
+		spore.kill( )
+		self.assertEqual( spore.stack, None )
+		self.assertEqual( stack, [ ] )
+
+		# Reset lets go of a stack even if one was left on the released spore
+		spore.stack = stack
+		self.app.pools[ FriendlySpore ].Recycle( )
+		reused = FriendlySpore.New( [0.0, 0.0] )
+		self.assertTrue( reused is spore )
+		self.assertEqual( reused.stack, None )
+
+		# Fill the old stack up until it turns into a tree
+		for i in range( 11 ):
+			self.Land( FriendlySpore, xc, ym ).CheckOnWater( )
+		self.assertTrue( reused.alive( ) )
+		self.assertEqual( Stacked( ), [ ] )
+
+
+if __name__ == '__main__':
+	unittest.main( )
\ No newline at end of file
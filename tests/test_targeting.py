@@ -0,0 +1,87 @@
+# -------- test_targeting.py --------
+# Flyers are given the nearest plant that can be hunted, and let go of plants
+# that can no longer be
+# ---------------------------
+
+# Imports
+import unittest
+from tests import Start
+import app.Config as Config
+from app.Friendly import FriendlyPlant
+from app.Enemy import EnemyFlying
+
+
+# -------- Targets Test --------
+class TargetsTest( unittest.TestCase ):
+
+	def setUp( self ):
+		self.app = Start( )
+		self.saved = Config.seed
+		Config.seed = 4
+		self.app.LoadGame( )
+
+		for p in list( self.app.sprite_groups['friendly-plants'] ):
+			p.kill( )
+		self.targets = self.app.targets
+
+	def tearDown( self ):
+		Config.seed = self.saved
+
+	# A plant on the ground at x
+	def Plant( self, x ):
+		plant = FriendlyPlant( )
+		plant.vector = [float( x ), 100.0]
+		self.targets.Place( plant )
+		return plant
+
+	def Assign( self ):
+		self.targets.Assign( self.app.sprite_groups['enemy-flying'] )
+
+	def testNearest( self ):
+		near, far = self.Plant( 1000 ), self.Plant( 100 )
+		flyer = EnemyFlying.New( [950.0, 50.0] )
+
+		self.Assign( )
+		self.assertTrue( flyer.target is near )
+		self.assertTrue( near.targeted_by is flyer )
+		self.assertEqual( len( self.targets.index ), 1 )
+
+	# The index follows plants as they move
+	def testMoved( self ):
+		plant, other = self.Plant( 100 ), self.Plant( 2000 )
+		plant.vector = [1000.0, 100.0]
+		self.targets.Place( plant )
+
+		flyer = EnemyFlying.New( [950.0, 50.0] )
+		self.Assign( )
+		self.assertTrue( flyer.target is plant )
+
+	# A flyer whose plant has died hunts another
+	def testDeadTarget( self ):
+		near, far = self.Plant( 1000 ), self.Plant( 100 )
+		flyer = EnemyFlying.New( [950.0, 50.0] )
+		self.Assign( )
+
+		near.kill( )
+		self.Assign( )
+		self.assertTrue( flyer.target is far )
+		self.assertEqual( len( self.targets.index ), 0 )
+
+		far.kill( )
+		self.Assign( )
+		self.assertEqual( flyer.target, False )
+		self.assertFalse( far.targeted )
+
+	# A dead flyer's plant can be hunted again
+	def testDeadFlyer( self ):
+		plant = self.Plant( 1000 )
+		flyer = EnemyFlying.New( [950.0, 50.0] )
+		self.Assign( )
+
+		flyer.DieOverlyDramatically( )
+		self.assertFalse( plant.targeted )
+		self.assertEqual( len( self.targets.index ), 1 )
+
+
+if __name__ == '__main__':
+	unittest.main( )
\ No newline at end of file
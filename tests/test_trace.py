@@ -0,0 +1,31 @@
+# -------- test_trace.py --------
+# Startup is traced once, however many games are loaded
+# ---------------------------
+
+# Imports
+import unittest
+from tests import Start
+from app import Trace
+
+
+# -------- Trace Test --------
+class TraceTest( unittest.TestCase ):
+
+	def setUp( self ):
+		self.app = Start( )
+		self.app.traced = False
+		del Trace.spans[:]
+		Trace.started.clear( )
+
+	def testLoadedAgain( self ):
+		for i in range( 3 ):
+			self.app.LoadGame( )
+			self.app.Tick( 16 )
+			Trace.End( "first frame" )
+
+		names = [ name for name, ms in Trace.spans ]
+		self.assertEqual( names, ["assets", "terrain", "first frame"] )
+
+
+if __name__ == '__main__':
+	unittest.main( )
\ No newline at end of file
@@ -0,0 +1,36 @@
+# -------- test_world.py --------
+# Starting trees are placed inside the world
+# ---------------------------
+
+# Imports
+import unittest
+from tests import Start
+import app.Config as Config
+
+
+# -------- World Test --------
+class WorldTest( unittest.TestCase ):
+
+	def setUp( self ):
+		self.app = Start( )
+		self.saved = Config.seed
+
+	def tearDown( self ):
+		Config.seed = self.saved
+
+	# The last water hole of this world is centred past its right edge
+	def testTreesInside( self ):
+		Config.seed = 152
+		self.app.LoadGame( )
+
+		world = Config.world
+		for x1, x2, xc, ym, t in world.Segments( True ):
+			self.assertTrue( xc < world.width )
+
+		for g in ('friendly-trees', 'enemy-trees'):
+			for tree in self.app.sprite_groups[g]:
+				self.assertTrue( 0 <= tree.vector[0] < world.width, (g, tree.vector) )
+
+
+if __name__ == '__main__':
+	unittest.main( )
\ No newline at end of file